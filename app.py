@@ -3,12 +3,70 @@ Flask API for Exoplanet Classification System
 Receives requests from Heroku website and returns predictions
 """
 
-from flask import Flask, request, jsonify
+import io
+from functools import lru_cache
+
+import numpy as np
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from exoplanet_classifier import ExoplanetClassificationSystem
-import os
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    print("Warning: orjson not available. Install with: pip install orjson")
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+    print("Warning: ijson not available. Install with: pip install ijson")
+
+try:
+    from flask_compress import Compress
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    COMPRESS_AVAILABLE = False
+    print("Warning: flask-compress not available. Install with: pip install flask-compress")
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes responses (including numpy values) with orjson."""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+# Input fields in the column order the models expect
+REQUIRED = (
+    'orbital_period',
+    'transit_duration',
+    'transit_depth',
+    'snr',
+    'stellar_mass',
+    'stellar_temp',
+    'stellar_magnitude'
+)
+REQUIRED_SET = frozenset(REQUIRED)
+
+# Observations scored per model call when streaming batch input
+BATCH_CHUNK_SIZE = 512
+
 
 app = Flask(__name__)
+if ORJSON_AVAILABLE:
+    app.json = ORJSONProvider(app)
+
+# Compress responses larger than 500 bytes (mostly batch results)
+if COMPRESS_AVAILABLE:
+    Compress(app)
 
 # Enable CORS for your GitHub Pages site
 CORS(app, 
@@ -24,10 +82,55 @@ CORS(app,
 
 # Load the model once when server starts
 print("Loading exoplanet classification model...")
-system = ExoplanetClassificationSystem()
+system = ExoplanetClassificationSystem(fast_load=True)
 system.load_models()
 print("Model loaded successfully!")
 
+# Run one prediction at startup so first-call costs (lazy imports, thread
+# pools, allocator warm-up) are paid before the first real request
+try:
+    system.predict_many(np.array([[289.9, 7.4, 0.00492, 12.0, 0.97, 5627.0, 11.7]]))
+except Exception as e:
+    print(f"Warning: model warm-up failed: {e}")
+
+
+@lru_cache(maxsize=10000)
+def _predict_cached(features):
+    """
+    Run a single prediction for the raw bytes of a float64 input row (in
+    REQUIRED order) and format the response. Results are cached, so repeated
+    queries for the same star skip the models entirely. The returned dict is
+    shared between callers and must not be mutated.
+    """
+    x = np.frombuffer(features, dtype=np.float64).reshape(1, len(REQUIRED))
+    
+    # Make prediction
+    result = system.predict_many(x, return_uncertainty=True)[0]
+    
+    # Format response
+    response = {
+        'status': 'success',
+        'classification': result['classification'],
+        'confidence': result['confidence'],
+        'class_probabilities': result['class_probabilities']
+    }
+    
+    # Add planet properties ONLY if they exist and classification is planet-related
+    if 'properties' in result and result['properties'] is not None:
+        # Only return properties for confirmed exoplanets and candidates
+        if result['classification'] in ['confirmed_exoplanet', 'planetary_candidate']:
+            response['properties'] = result['properties']
+        # For false positives, explicitly set properties to null
+        else:
+            response['properties'] = None
+            response['message'] = 'No planetary properties - classified as false positive'
+    
+    # Add uncertainty if available
+    if 'uncertainty' in result:
+        response['uncertainty'] = result['uncertainty']
+    
+    return response
+
 
 @app.route('/', methods=['GET'])
 def home():
@@ -101,65 +204,20 @@ def predict_exoplanet():
         data = request.get_json()
         
         # Validate required fields
-        required_fields = [
-            'orbital_period',
-            'transit_duration',
-            'transit_depth',
-            'snr',
-            'stellar_mass',
-            'stellar_temp',
-            'stellar_magnitude'
-        ]
-        
-        missing_fields = [field for field in required_fields if field not in data]
-        if missing_fields:
+        if REQUIRED_SET - data.keys():
+            missing_fields = [field for field in REQUIRED if field not in data]
             return jsonify({
                 'error': f'Missing required fields: {", ".join(missing_fields)}',
-                'required_fields': required_fields
+                'required_fields': list(REQUIRED)
             }), 400
         
-        # Create input dictionary
-        input_features = {
-            'orbital_period': float(data['orbital_period']),
-            'transit_duration': float(data['transit_duration']),
-            'transit_depth': float(data['transit_depth']),
-            'snr': float(data['snr']),
-            'stellar_mass': float(data['stellar_mass']),
-            'stellar_temp': float(data['stellar_temp']),
-            'stellar_magnitude': float(data['stellar_magnitude'])
-        }
-        
-        # Make prediction
-        result = system.predict(input_features, return_uncertainty=True)
-        
-        # Format response
-        response = {
-            'status': 'success',
-            'classification': result['classification'],
-            'confidence': float(result['confidence']),
-            'class_probabilities': {
-                k: float(v) for k, v in result['class_probabilities'].items()
-            }
-        }
-        
-        # Add planet properties ONLY if they exist and classification is planet-related
-        if 'properties' in result and result['properties'] is not None:
-            # Only return properties for confirmed exoplanets and candidates
-            if result['classification'] in ['confirmed_exoplanet', 'planetary_candidate']:
-                response['properties'] = {
-                    'planet_radius': float(result['properties']['planet_radius']),
-                    'planet_temp': float(result['properties']['planet_temp']),
-                    'semi_major_axis': float(result['properties']['semi_major_axis']),
-                    'impact_parameter': float(result['properties']['impact_parameter'])
-                }
-            # For false positives, explicitly set properties to null
-            else:
-                response['properties'] = None
-                response['message'] = 'No planetary properties - classified as false positive'
+        # Create the input row directly (its bytes are the cache key)
+        x = np.fromiter((data[field] for field in REQUIRED), dtype=np.float64, count=len(REQUIRED))
+        if not np.isfinite(x).all():
+            raise ValueError('all fields must be finite numbers')
         
-        # Add uncertainty if available
-        if 'uncertainty' in result:
-            response['uncertainty'] = float(result['uncertainty'])
+        # Make prediction (served from cache for repeated inputs)
+        response = _predict_cached(x.tobytes())
         
         return jsonify(response), 200
         
@@ -176,6 +234,91 @@ def predict_exoplanet():
         }), 500
 
 
+def _predict_observations(observations, start=0):
+    """
+    Validate a list of observation dicts, score the valid ones with a single
+    vectorized model call and return one result dict per observation.
+    Result indices are numbered from ``start``.
+    """
+    results = [None] * len(observations)
+    
+    # Validate and stack the observations into a single (N, 7) matrix
+    rows = []
+    row_indices = []
+    for i, obs in enumerate(observations):
+        try:
+            rows.append([float(obs[field]) for field in REQUIRED])
+            row_indices.append(i)
+        except Exception as e:
+            results[i] = {
+                'index': start + i,
+                'status': 'error',
+                'error': str(e)
+            }
+    
+    # Run the whole batch through the models in one call
+    if rows:
+        try:
+            batch_results = system.predict_many(np.asarray(rows, dtype=np.float64))
+        except Exception:
+            # Some row broke the batch pass: score the rows one at a time so
+            # each observation only fails on its own input
+            batch_results = []
+            for row in rows:
+                try:
+                    batch_results.extend(system.predict_many(np.asarray([row], dtype=np.float64)))
+                except Exception as e:
+                    batch_results.append(e)
+        
+        for i, result in zip(row_indices, batch_results):
+            if isinstance(result, Exception):
+                results[i] = {
+                    'index': start + i,
+                    'status': 'error',
+                    'error': str(result)
+                }
+                continue
+            
+            prediction = {
+                'index': start + i,
+                'status': 'success',
+                'classification': result['classification'],
+                'confidence': result['confidence']
+            }
+            
+            if 'properties' in result:
+                prediction['properties'] = result['properties']
+            
+            results[i] = prediction
+    
+    return results
+
+
+def _stream_batch(stream):
+    """
+    Parse observations incrementally from the request body and yield NDJSON
+    result lines, scoring BATCH_CHUNK_SIZE observations per model call.
+    """
+    chunk = []
+    start = 0
+    try:
+        # Buffer the raw WSGI stream (ijson probes it with zero-length reads)
+        for obs in ijson.items(io.BufferedReader(stream), 'observations.item', use_float=True):
+            chunk.append(obs)
+            if len(chunk) == BATCH_CHUNK_SIZE:
+                for result in _predict_observations(chunk, start):
+                    yield app.json.dumps(result) + '\n'
+                start += len(chunk)
+                chunk = []
+        
+        if chunk:
+            for result in _predict_observations(chunk, start):
+                yield app.json.dumps(result) + '\n'
+    
+    except Exception as e:
+        yield app.json.dumps({'status': 'error', 'error': str(e)}) + '\n'
+
+
 @app.route('/predict/batch', methods=['POST'])
 def predict_batch():
     """
@@ -192,7 +335,14 @@ def predict_batch():
             ...
         ]
     }
+    
+    Clients sending "Accept: application/x-ndjson" get one JSON result per
+    line, streamed while the request body is still being parsed.
     """
+    if IJSON_AVAILABLE and request.accept_mimetypes.best == 'application/x-ndjson':
+        return Response(stream_with_context(_stream_batch(request.stream)),
+                        mimetype='application/x-ndjson')
+    
     try:
         data = request.get_json()
         
@@ -202,47 +352,11 @@ def predict_batch():
             }), 400
         
         observations = data['observations']
-        results = []
-        
-        for i, obs in enumerate(observations):
-            try:
-                input_features = {
-                    'orbital_period': float(obs['orbital_period']),
-                    'transit_duration': float(obs['transit_duration']),
-                    'transit_depth': float(obs['transit_depth']),
-                    'snr': float(obs['snr']),
-                    'stellar_mass': float(obs['stellar_mass']),
-                    'stellar_temp': float(obs['stellar_temp']),
-                    'stellar_magnitude': float(obs['stellar_magnitude'])
-                }
-                
-                result = system.predict(input_features)
-                
-                prediction = {
-                    'index': i,
-                    'status': 'success',
-                    'classification': result['classification'],
-                    'confidence': float(result['confidence'])
-                }
-                
-                if 'properties' in result:
-                    prediction['properties'] = {
-                        k: float(v) for k, v in result['properties'].items()
-                    }
-                
-                results.append(prediction)
-                
-            except Exception as e:
-                results.append({
-                    'index': i,
-                    'status': 'error',
-                    'error': str(e)
-                })
         
         return jsonify({
             'status': 'success',
             'total': len(observations),
-            'results': results
+            'results': _predict_observations(observations)
         }), 200
         
     except Exception as e:
@@ -250,8 +364,3 @@ def predict_batch():
             'status': 'error',
             'error': str(e)
         }), 500
-
-
-if __name__ == '__main__':
-    port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
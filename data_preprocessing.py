@@ -5,11 +5,67 @@ Implements robust preprocessing inspired by NASA's EMAC techniques.
 
 import numpy as np
 import pandas as pd
-from scipy import stats
-from sklearn.preprocessing import StandardScaler, RobustScaler
-from sklearn.impute import SimpleImputer
-import warnings
-warnings.filterwarnings('ignore')
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    print("Warning: Numba not available. Install with: pip install numba")
+
+try:
+    import numexpr as ne
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
+    print("Warning: NumExpr not available. Install with: pip install numexpr")
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _mad_filter(X, threshold):
+        """
+        Fused modified Z-score filter over the columns of X (Fortran order).
+        Returns a boolean mask of rows with no outlying value.
+        """
+        n_rows, n_cols = X.shape
+        median = np.empty(n_cols)
+        mad = np.empty(n_cols)
+        for j in prange(n_cols):
+            median[j] = np.nanmedian(X[:, j])
+            mad[j] = np.nanmedian(np.abs(X[:, j] - median[j]))
+        
+        keep = np.ones(n_rows, dtype=np.bool_)
+        for i in prange(n_rows):
+            for j in range(n_cols):
+                # Constant (or all-missing) columns never flag a row
+                if mad[j] > 0 and np.abs(0.6745 * (X[i, j] - median[j]) / mad[j]) >= threshold:
+                    keep[i] = False
+                    break
+        return keep
+    
+    @njit(parallel=True, cache=True, error_model='numpy')
+    def _quality_scores(snr, depth):
+        """Fused SNR / transit depth quality score kernel."""
+        scores = np.ones(snr.shape[0])
+        for i in prange(snr.shape[0]):
+            if snr[i] < 7:
+                scores[i] *= 0.7
+            if depth[i] < 1.0 / snr[i]:
+                scores[i] *= 0.5
+        return scores
+
+
+# Physically plausible (exclusive) ranges used to reject artifacts; None = unbounded
+PHYSICAL_BOUNDS = {
+    'orbital_period': (0, None),
+    'transit_duration': (0, None),
+    'transit_depth': (0, 1),
+    'stellar_temp': (2000, 50000),
+    'stellar_mass': (0.1, 100)
+}
+
+LOG_TRANSFORM_COLS = ['orbital_period', 'transit_duration', 'transit_depth']
 
 
 class ExoplanetDataPreprocessor:
@@ -18,131 +74,238 @@ class ExoplanetDataPreprocessor:
     """
     
     def __init__(self):
-        self.scaler = RobustScaler()
-        self.imputer = SimpleImputer(strategy='median')
+        self.center_ = None
+        self.scale_ = None
+        self.medians_ = None
         self.feature_names = None
+    
+    @staticmethod
+    def _outlier_mask(X, threshold):
+        """
+        Boolean mask of rows in X with no modified Z-score at or above threshold.
+        """
+        if NUMBA_AVAILABLE:
+            return _mad_filter(np.asfortranarray(X), threshold)
+        
+        median = np.nanmedian(X, axis=0)
+        mad = np.nanmedian(np.abs(X - median), axis=0)
+        mad[~(mad > 0)] = np.inf  # Skip constant columns
+        modified_z_scores = 0.6745 * (X - median) / mad
+        return ~(np.abs(modified_z_scores) >= threshold).any(axis=1)
+    
+    def _impute_medians(self, X, fit=True):
+        """
+        Fill NaNs in X in place with per-column medians.
+        The medians are learned when fitting and reused otherwise.
+        """
+        medians = getattr(self, 'medians_', None)
+        if fit or medians is None:
+            medians = np.nanmedian(X, axis=0)
+            self.medians_ = medians
+        
+        mask = np.isnan(X)
+        X[mask] = np.take(medians, np.nonzero(mask)[1])
+        return X
+    
+    @staticmethod
+    def _artifact_mask(X, col_idx):
+        """
+        Boolean mask of rows in X whose values lie inside PHYSICAL_BOUNDS.
+        All bounds are checked in one fused pass: a single NumExpr expression
+        over the raw columns, or a broadcast comparison without NumExpr.
+        Both compare in float64, so values on or next to a bound (e.g.
+        stellar_mass == 0.1) get the same answer on either path.
+        """
+        cols = [col for col in PHYSICAL_BOUNDS if col in col_idx]
+        if not cols:
+            return np.ones(len(X), dtype=bool)
+        X = np.asarray(X, dtype=np.float64)
+        
+        if NUMEXPR_AVAILABLE:
+            local_dict = {}
+            terms = []
+            for j, col in enumerate(cols):
+                low, high = PHYSICAL_BOUNDS[col]
+                local_dict[f'c{j}'] = X[:, col_idx[col]]
+                terms.append(f'(c{j} > {low!r})')
+                if high is not None:
+                    terms.append(f'(c{j} < {high!r})')
+            return ne.evaluate(' & '.join(terms), local_dict=local_dict)
+        
+        values = X[:, [col_idx[col] for col in cols]]
+        low = np.array([PHYSICAL_BOUNDS[col][0] for col in cols], dtype=np.float64)
+        high = np.array([np.inf if PHYSICAL_BOUNDS[col][1] is None else PHYSICAL_BOUNDS[col][1]
+                         for col in cols], dtype=np.float64)
+        
+        # Unbounded columns (high = inf) have no upper limit, not even inf itself
+        in_range = (values > low) & ((values < high) | np.isposinf(high))
+        return np.logical_and.reduce(in_range, axis=1)
+    
+    @staticmethod
+    def _log_transform(X, col_idx, columns):
+        """
+        Apply log1p in place to the given columns of X.
+        """
+        for col in columns:
+            if col in col_idx:
+                values = X[:, col_idx[col]]
+                # Add small constant to avoid log(0)
+                min_val = np.nanmin(values)
+                if NUMEXPR_AVAILABLE:
+                    # One fused, multi-threaded pass (expressions are compiled once and cached)
+                    if min_val <= 0:
+                        ne.evaluate('log1p(values - min_val + 1e-10)', out=values)
+                    else:
+                        ne.evaluate('log1p(values)', out=values)
+                    continue
+                if min_val <= 0:
+                    values -= min_val
+                    values += 1e-10
+                np.log1p(values, out=values)
+    
+    @staticmethod
+    def _quality_score_array(snr, depth=None):
+        """
+        Quality score array from SNR and (optionally) transit depth.
+        """
+        if NUMBA_AVAILABLE and depth is not None:
+            return _quality_scores(snr, depth)
+        
+        if NUMEXPR_AVAILABLE:
+            # Both penalties fused into one expression, no intermediate masks
+            if depth is None:
+                return ne.evaluate('where(snr < 7, 0.7, 1.0)')
+            return ne.evaluate('where(snr < 7, 0.7, 1.0) * where(depth < 1.0 / snr, 0.5, 1.0)')
+        
+        quality_scores = np.ones(len(snr))
+        
+        # SNR quality
+        quality_scores[snr < 7] *= 0.7
+        
+        # Transit depth consistency
+        if depth is not None:
+            with np.errstate(divide='ignore'):
+                expected_depth_uncertainty = 1.0 / snr
+            quality_scores[depth < expected_depth_uncertainty] *= 0.5
+        
+        return quality_scores
         
     def remove_outliers(self, df, columns, threshold=3.5):
         """
         Remove outliers using modified Z-score method.
         More robust than standard deviation for skewed distributions.
         """
-        df_clean = df.copy()
-        
-        for col in columns:
-            if col in df_clean.columns:
-                median = df_clean[col].median()
-                mad = np.median(np.abs(df_clean[col] - median))
-                if mad > 0:
-                    modified_z_scores = 0.6745 * (df_clean[col] - median) / mad
-                    df_clean = df_clean[np.abs(modified_z_scores) < threshold]
+        cols = [col for col in columns if col in df.columns]
+        if not cols:
+            return df
         
-        return df_clean
+        # Score every column at once on the raw matrix and apply one combined mask
+        keep = self._outlier_mask(df[cols].to_numpy(dtype=np.float64), threshold)
+        return df[keep]
     
-    def handle_missing_values(self, df):
+    def handle_missing_values(self, df, fit=True, numeric_cols=None):
         """
         Handle missing values with intelligent imputation.
+        Pass numeric_cols to skip the dtype scan when the columns are already known.
         """
         # For critical features, use median imputation
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        df[numeric_cols] = self.imputer.fit_transform(df[numeric_cols])
+        if numeric_cols is None:
+            numeric_cols = df.select_dtypes(include=[np.number]).columns
+        df[numeric_cols] = self._impute_medians(df[numeric_cols].to_numpy(dtype=np.float64, copy=True), fit=fit)
         
         return df
     
     def apply_log_transform(self, df, columns):
         """
         Apply log transformation to highly skewed features.
+        The columns are replaced in place on df.
         """
-        df_transformed = df.copy()
-        
-        for col in columns:
-            if col in df_transformed.columns:
-                # Add small constant to avoid log(0)
-                min_val = df_transformed[col].min()
-                if min_val <= 0:
-                    df_transformed[col] = df_transformed[col] - min_val + 1e-10
-                df_transformed[col] = np.log1p(df_transformed[col])
+        cols = [col for col in columns if col in df.columns]
+        if cols:
+            X = df[cols].to_numpy(dtype=np.float64, copy=True)
+            self._log_transform(X, {col: j for j, col in enumerate(cols)}, cols)
+            df[cols] = X
         
-        return df_transformed
+        return df
     
     def detect_and_remove_artifacts(self, df):
         """
         Detect and handle light curve artifacts and instrumental noise.
         Based on techniques from Osborn et al. (2022) MNRAS paper.
         """
-        df_clean = df.copy()
-        
         # Remove physically impossible values
-        if 'orbital_period' in df_clean.columns:
-            df_clean = df_clean[df_clean['orbital_period'] > 0]
-        if 'transit_duration' in df_clean.columns:
-            df_clean = df_clean[df_clean['transit_duration'] > 0]
-        if 'transit_depth' in df_clean.columns:
-            df_clean = df_clean[(df_clean['transit_depth'] > 0) & (df_clean['transit_depth'] < 1)]
-        if 'stellar_temp' in df_clean.columns:
-            df_clean = df_clean[(df_clean['stellar_temp'] > 2000) & (df_clean['stellar_temp'] < 50000)]
-        if 'stellar_mass' in df_clean.columns:
-            df_clean = df_clean[(df_clean['stellar_mass'] > 0.1) & (df_clean['stellar_mass'] < 100)]
+        cols = [col for col in PHYSICAL_BOUNDS if col in df.columns]
+        X = df[cols].to_numpy(dtype=np.float64)
+        keep = self._artifact_mask(X, {col: j for j, col in enumerate(cols)})
         
-        return df_clean
+        # Single slice at the end, skipped entirely for clean data
+        if keep.all():
+            return df
+        return df[keep]
     
     def calculate_quality_metrics(self, df):
         """
         Calculate data quality metrics for filtering low-quality observations.
         """
-        quality_scores = []
-        
-        for idx, row in df.iterrows():
-            score = 1.0
-            
-            # SNR quality
-            if 'snr' in row and row['snr'] < 7:
-                score *= 0.7
-            
-            # Transit depth consistency
-            if 'transit_depth' in row and 'snr' in row:
-                expected_depth_uncertainty = 1.0 / row['snr']
-                if row['transit_depth'] < expected_depth_uncertainty:
-                    score *= 0.5
-            
-            quality_scores.append(score)
+        if 'snr' in df.columns:
+            snr = df['snr'].to_numpy(dtype=np.float64)
+            depth = None
+            if 'transit_depth' in df.columns:
+                depth = df['transit_depth'].to_numpy(dtype=np.float64)
+            df['quality_score'] = self._quality_score_array(snr, depth)
+        else:
+            df['quality_score'] = np.ones(len(df))
         
-        df['quality_score'] = quality_scores
         return df
     
     def preprocess(self, df, fit=True):
         """
         Complete preprocessing pipeline.
+        The frame is converted to a single float64 matrix on entry, every stage
+        works on that matrix, and a DataFrame is rebuilt once on exit.
         """
         # Store original feature names
         if fit:
             self.feature_names = df.columns.tolist()
         
+        columns = df.columns.tolist()
+        col_idx = {col: j for j, col in enumerate(columns)}
+        X = df.to_numpy(dtype=np.float64, copy=True)
+        index = df.index.to_numpy()
+        
         # Remove artifacts and physically impossible values
-        df = self.detect_and_remove_artifacts(df)
+        keep = self._artifact_mask(X, col_idx)
+        if not keep.all():
+            X, index = X[keep], index[keep]
         
         # Handle missing values
-        df = self.handle_missing_values(df)
+        X = self._impute_medians(X, fit=fit)
         
         # Apply log transform to skewed features
-        log_transform_cols = ['orbital_period', 'transit_duration', 'transit_depth']
-        log_transform_cols = [col for col in log_transform_cols if col in df.columns]
-        df = self.apply_log_transform(df, log_transform_cols)
+        self._log_transform(X, col_idx, LOG_TRANSFORM_COLS)
         
         # Remove outliers
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        df = self.remove_outliers(df, numeric_cols, threshold=4.0)
+        keep = self._outlier_mask(X, threshold=4.0)
+        if not keep.all():
+            X, index = X[keep], index[keep]
         
-        # Calculate quality metrics
-        if 'snr' in df.columns and 'transit_depth' in df.columns:
-            df = self.calculate_quality_metrics(df)
-        
-        # Scale features
-        numeric_cols = [col for col in df.columns if col != 'quality_score']
+        # Robust scaling (median / IQR, as RobustScaler) applied in place on a
+        # float32 copy; all three quantiles come from one percentile call
         if fit:
-            df[numeric_cols] = self.scaler.fit_transform(df[numeric_cols])
-        else:
-            df[numeric_cols] = self.scaler.transform(df[numeric_cols])
+            q1, median, q3 = np.percentile(X, [25, 50, 75], axis=0)
+            iqr = q3 - q1
+            self.center_ = median.astype(np.float32)
+            self.scale_ = np.where(iqr > 0, iqr, 1.0).astype(np.float32)
+        X_scaled = X.astype(np.float32)
+        X_scaled -= self.center_
+        X_scaled /= self.scale_
+        
+        df = pd.DataFrame(X_scaled, index=pd.Index(index, name=df.index.name), columns=columns)
+        
+        # Calculate quality metrics (on the unscaled values)
+        if 'snr' in col_idx and 'transit_depth' in col_idx:
+            df['quality_score'] = self._quality_score_array(X[:, col_idx['snr']],
+                                                            X[:, col_idx['transit_depth']])
         
         return df
 
@@ -166,7 +329,7 @@ def load_nasa_exoplanet_data():
     # Fallback: Generate synthetic dataset
     print("Generating synthetic training dataset based on Kepler/TESS statistics...")
     
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
     n_samples = 5000
     
     # Create different classes with realistic distributions
@@ -174,148 +337,139 @@ def load_nasa_exoplanet_data():
     n_candidate = int(n_samples * 0.35)
     n_false_positive = n_samples - n_confirmed - n_candidate
     
-    data = []
-    
     # Confirmed exoplanets (based on Kepler statistics)
-    for _ in range(n_confirmed):
-        # Mix of short, medium, and long period planets
-        period_type = np.random.choice(['short', 'medium', 'long'], p=[0.5, 0.3, 0.2])
-        if period_type == 'short':
-            orbital_period = np.random.lognormal(1.5, 1.0)  # Hot Jupiters, close-in planets
-        elif period_type == 'medium':
-            orbital_period = np.random.lognormal(3.5, 0.8)  # ~30-100 days
-        else:
-            orbital_period = np.random.lognormal(5.0, 0.7)  # Long period (100-500+ days)
-        
-        stellar_mass = np.random.normal(1.0, 0.3)  # Solar masses
-        stellar_temp = np.random.normal(5500, 800)  # Kelvin
-        stellar_magnitude = np.random.normal(14, 2)
-        
-        # Calculate realistic transit parameters
-        planet_radius = np.random.lognormal(0.5, 0.8)  # Earth radii
-        
-        # Stellar radius estimate (ensure positive)
-        stellar_radius = abs(stellar_mass) ** 0.8
-        transit_depth = (planet_radius / (stellar_radius * 109.1)) ** 2  # More accurate
-        transit_depth = float(np.real(transit_depth))  # Ensure real number
-        
-        # Transit duration scales with period (longer period = longer duration)
-        base_duration = 2 + np.log1p(abs(orbital_period)) * 0.5
-        transit_duration = abs(np.random.normal(base_duration, base_duration * 0.2))
-        
-        # SNR decreases with period (fewer transits observed)
-        snr_mean = max(5, 15 / (1 + abs(orbital_period) / 50))  # Lower SNR for long periods
-        snr = abs(np.random.lognormal(np.log(snr_mean), 0.5))
-        semi_major_axis = (orbital_period / 365.25) ** (2/3) * stellar_mass ** (1/3)  # AU
-        planet_temp = stellar_temp * np.sqrt(1 / (2 * semi_major_axis)) * 0.01
-        impact_parameter = np.random.uniform(0, 0.9)
-        
-        data.append({
-            'orbital_period': max(0.5, orbital_period),
-            'transit_duration': max(0.5, transit_duration),
-            'transit_depth': max(0.0001, min(0.1, transit_depth)),
-            'snr': max(5, snr),
-            'stellar_mass': max(0.1, stellar_mass),
-            'stellar_temp': max(3000, min(10000, stellar_temp)),
-            'stellar_magnitude': max(8, min(20, stellar_magnitude)),
-            'classification': 'confirmed_exoplanet',
-            'planet_radius': planet_radius,
-            'planet_temp': planet_temp,
-            'semi_major_axis': semi_major_axis,
-            'impact_parameter': impact_parameter
-        })
+    # Mix of short, medium, and long period planets:
+    # Hot Jupiters/close-in planets, ~30-100 days, long period (100-500+ days)
+    period_type = rng.choice(3, size=n_confirmed, p=[0.5, 0.3, 0.2])
+    orbital_period = rng.lognormal(np.choose(period_type, [1.5, 3.5, 5.0]),
+                                  np.choose(period_type, [1.0, 0.8, 0.7]))
+    
+    stellar_mass = rng.normal(1.0, 0.3, n_confirmed)  # Solar masses
+    stellar_temp = rng.normal(5500, 800, n_confirmed)  # Kelvin
+    stellar_magnitude = rng.normal(14, 2, n_confirmed)
+    
+    # Calculate realistic transit parameters
+    planet_radius = rng.lognormal(0.5, 0.8, n_confirmed)  # Earth radii
+    
+    # Stellar radius estimate (ensure positive)
+    stellar_radius = np.abs(stellar_mass) ** 0.8
+    transit_depth = (planet_radius / (stellar_radius * 109.1)) ** 2  # More accurate
+    
+    # Transit duration scales with period (longer period = longer duration)
+    base_duration = 2 + np.log1p(np.abs(orbital_period)) * 0.5
+    transit_duration = np.abs(rng.normal(base_duration, base_duration * 0.2))
+    
+    # SNR decreases with period (fewer transits observed)
+    snr_mean = np.maximum(5, 15 / (1 + np.abs(orbital_period) / 50))  # Lower SNR for long periods
+    snr = np.abs(rng.lognormal(np.log(snr_mean), 0.5))
+    semi_major_axis = (orbital_period / 365.25) ** (2/3) * stellar_mass ** (1/3)  # AU
+    planet_temp = stellar_temp * np.sqrt(1 / (2 * semi_major_axis)) * 0.01
+    impact_parameter = rng.uniform(0, 0.9, n_confirmed)
+    
+    confirmed = {
+        'orbital_period': np.maximum(0.5, orbital_period),
+        'transit_duration': np.maximum(0.5, transit_duration),
+        'transit_depth': np.clip(transit_depth, 0.0001, 0.1),
+        'snr': np.maximum(5, snr),
+        'stellar_mass': np.maximum(0.1, stellar_mass),
+        'stellar_temp': np.clip(stellar_temp, 3000, 10000),
+        'stellar_magnitude': np.clip(stellar_magnitude, 8, 20),
+        'classification': 'confirmed_exoplanet',
+        'planet_radius': planet_radius,
+        'planet_temp': planet_temp,
+        'semi_major_axis': semi_major_axis,
+        'impact_parameter': impact_parameter
+    }
     
     # Planetary candidates (similar but more uncertain)
-    for _ in range(n_candidate):
-        # More diverse period distribution for candidates
-        period_type = np.random.choice(['short', 'medium', 'long'], p=[0.4, 0.35, 0.25])
-        if period_type == 'short':
-            orbital_period = np.random.lognormal(1.5, 1.2)
-        elif period_type == 'medium':
-            orbital_period = np.random.lognormal(3.5, 1.0)
-        else:
-            orbital_period = np.random.lognormal(5.0, 0.8)
-        
-        stellar_mass = np.random.normal(1.0, 0.4)
-        stellar_temp = np.random.normal(5500, 1000)
-        stellar_magnitude = np.random.normal(15, 2.5)
-        
-        planet_radius = np.random.lognormal(0.5, 1.0)
-        
-        stellar_radius = abs(stellar_mass) ** 0.8
-        transit_depth = (planet_radius / (stellar_radius * 109.1)) ** 2
-        transit_depth = float(np.real(transit_depth))
-        
-        base_duration = 2 + np.log1p(abs(orbital_period)) * 0.5
-        transit_duration = abs(np.random.normal(base_duration, base_duration * 0.3))
-        
-        snr_mean = max(4, 12 / (1 + abs(orbital_period) / 50))
-        snr = abs(np.random.lognormal(np.log(snr_mean), 0.6))  # Lower SNR for candidates
-        semi_major_axis = (orbital_period / 365.25) ** (2/3) * stellar_mass ** (1/3)
-        planet_temp = stellar_temp * np.sqrt(1 / (2 * semi_major_axis)) * 0.01
-        impact_parameter = np.random.uniform(0, 0.95)
-        
-        data.append({
-            'orbital_period': max(0.5, orbital_period),
-            'transit_duration': max(0.5, transit_duration),
-            'transit_depth': max(0.0001, min(0.1, transit_depth)),
-            'snr': max(4, snr),
-            'stellar_mass': max(0.1, stellar_mass),
-            'stellar_temp': max(3000, min(10000, stellar_temp)),
-            'stellar_magnitude': max(8, min(20, stellar_magnitude)),
-            'classification': 'planetary_candidate',
-            'planet_radius': planet_radius,
-            'planet_temp': planet_temp,
-            'semi_major_axis': semi_major_axis,
-            'impact_parameter': impact_parameter
-        })
+    # More diverse period distribution for candidates
+    period_type = rng.choice(3, size=n_candidate, p=[0.4, 0.35, 0.25])
+    orbital_period = rng.lognormal(np.choose(period_type, [1.5, 3.5, 5.0]),
+                                  np.choose(period_type, [1.2, 1.0, 0.8]))
+    
+    stellar_mass = rng.normal(1.0, 0.4, n_candidate)
+    stellar_temp = rng.normal(5500, 1000, n_candidate)
+    stellar_magnitude = rng.normal(15, 2.5, n_candidate)
+    
+    planet_radius = rng.lognormal(0.5, 1.0, n_candidate)
+    
+    stellar_radius = np.abs(stellar_mass) ** 0.8
+    transit_depth = (planet_radius / (stellar_radius * 109.1)) ** 2
+    
+    base_duration = 2 + np.log1p(np.abs(orbital_period)) * 0.5
+    transit_duration = np.abs(rng.normal(base_duration, base_duration * 0.3))
+    
+    snr_mean = np.maximum(4, 12 / (1 + np.abs(orbital_period) / 50))
+    snr = np.abs(rng.lognormal(np.log(snr_mean), 0.6))  # Lower SNR for candidates
+    semi_major_axis = (orbital_period / 365.25) ** (2/3) * stellar_mass ** (1/3)
+    planet_temp = stellar_temp * np.sqrt(1 / (2 * semi_major_axis)) * 0.01
+    impact_parameter = rng.uniform(0, 0.95, n_candidate)
+    
+    candidate = {
+        'orbital_period': np.maximum(0.5, orbital_period),
+        'transit_duration': np.maximum(0.5, transit_duration),
+        'transit_depth': np.clip(transit_depth, 0.0001, 0.1),
+        'snr': np.maximum(4, snr),
+        'stellar_mass': np.maximum(0.1, stellar_mass),
+        'stellar_temp': np.clip(stellar_temp, 3000, 10000),
+        'stellar_magnitude': np.clip(stellar_magnitude, 8, 20),
+        'classification': 'planetary_candidate',
+        'planet_radius': planet_radius,
+        'planet_temp': planet_temp,
+        'semi_major_axis': semi_major_axis,
+        'impact_parameter': impact_parameter
+    }
     
     # False positives (eclipsing binaries, artifacts)
-    for _ in range(n_false_positive):
-        # False positives have different characteristics
-        fp_type = np.random.choice(['eclipsing_binary', 'background', 'artifact'], 
-                                   p=[0.6, 0.25, 0.15])
-        
-        if fp_type == 'eclipsing_binary':
-            # Short period binaries
-            orbital_period = np.random.lognormal(1.0, 1.5)
-            # VERY deep transits (much deeper than planets)
-            transit_depth = np.random.uniform(0.01, 0.3)  # 1-30%
-            transit_duration = np.random.normal(5, 2)
-            snr = np.random.lognormal(2.0, 0.8)
-        elif fp_type == 'background':
-            # Background eclipsing binary blended with target
-            orbital_period = np.random.lognormal(1.5, 2.0)
-            transit_depth = np.random.lognormal(-5, 1.0)  # Shallow
-            transit_duration = np.random.normal(3, 2)
-            snr = np.random.lognormal(1.2, 1.0)  # Low SNR
-        else:  # artifact
-            # Instrumental artifacts - random periods
-            orbital_period = np.random.uniform(0.5, 100)
-            transit_depth = np.random.lognormal(-5, 1.5)
-            transit_duration = np.random.uniform(1, 10)
-            snr = np.random.lognormal(1.0, 1.2)  # Low to medium SNR
-        
-        stellar_mass = np.random.normal(1.0, 0.5)
-        stellar_temp = np.random.normal(5500, 1200)
-        stellar_magnitude = np.random.normal(15.5, 3)
-        
-        data.append({
-            'orbital_period': max(0.5, orbital_period),
-            'transit_duration': max(0.5, transit_duration),
-            'transit_depth': max(0.0001, min(0.3, transit_depth)),
-            'snr': max(3, snr),
-            'stellar_mass': max(0.1, stellar_mass),
-            'stellar_temp': max(3000, min(10000, stellar_temp)),
-            'stellar_magnitude': max(8, min(20, stellar_magnitude)),
-            'classification': 'false_positive',
-            'planet_radius': np.nan,
-            'planet_temp': np.nan,
-            'semi_major_axis': np.nan,
-            'impact_parameter': np.nan
-        })
-    
-    df = pd.DataFrame(data)
+    # False positives have different characteristics
+    n = n_false_positive
+    fp_type = rng.choice(3, size=n, p=[0.6, 0.25, 0.15])  # eclipsing_binary, background, artifact
+    
+    # Eclipsing binary: short period binaries with VERY deep transits (1-30%)
+    # Background: eclipsing binary blended with target - shallow, low SNR
+    # Artifact: instrumental artifacts with random periods, low to medium SNR
+    orbital_period = np.choose(fp_type, [rng.lognormal(1.0, 1.5, n),
+                                         rng.lognormal(1.5, 2.0, n),
+                                         rng.uniform(0.5, 100, n)])
+    transit_depth = np.choose(fp_type, [rng.uniform(0.01, 0.3, n),
+                                        rng.lognormal(-5, 1.0, n),
+                                        rng.lognormal(-5, 1.5, n)])
+    transit_duration = np.choose(fp_type, [rng.normal(5, 2, n),
+                                           rng.normal(3, 2, n),
+                                           rng.uniform(1, 10, n)])
+    snr = np.choose(fp_type, [rng.lognormal(2.0, 0.8, n),
+                              rng.lognormal(1.2, 1.0, n),
+                              rng.lognormal(1.0, 1.2, n)])
+    
+    stellar_mass = rng.normal(1.0, 0.5, n)
+    stellar_temp = rng.normal(5500, 1200, n)
+    stellar_magnitude = rng.normal(15.5, 3, n)
+    
+    false_positive = {
+        'orbital_period': np.maximum(0.5, orbital_period),
+        'transit_duration': np.maximum(0.5, transit_duration),
+        'transit_depth': np.clip(transit_depth, 0.0001, 0.3),
+        'snr': np.maximum(3, snr),
+        'stellar_mass': np.maximum(0.1, stellar_mass),
+        'stellar_temp': np.clip(stellar_temp, 3000, 10000),
+        'stellar_magnitude': np.clip(stellar_magnitude, 8, 20),
+        'classification': 'false_positive',
+        'planet_radius': np.nan,
+        'planet_temp': np.nan,
+        'semi_major_axis': np.nan,
+        'impact_parameter': np.nan
+    }
+    
+    # Fill preallocated columns class by class (scalars broadcast over their
+    # slice) and wrap them without another copy or per-row type inference
+    columns = {col: np.empty(n_samples, dtype=object if col == 'classification' else np.float64)
+               for col in confirmed}
+    bounds = np.cumsum([0, n_confirmed, n_candidate, n_false_positive])
+    for part, start, end in zip([confirmed, candidate, false_positive], bounds[:-1], bounds[1:]):
+        for col, values in part.items():
+            columns[col][start:end] = values
+    
+    df = pd.DataFrame(columns, copy=False)
     return df
 
 
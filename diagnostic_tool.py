@@ -24,11 +24,11 @@ def analyze_observation(params):
     stellar_temp = params['stellar_temp']
     stellar_mag = params['stellar_magnitude']
     
-    # Calculate derived quantities
-    stellar_radius = stellar_mass ** 0.8  # Solar radii
-    radius_ratio = np.sqrt(depth)
-    planet_radius_est = radius_ratio * stellar_radius * 109.1  # Earth radii
-    semi_major_axis = (period / 365.25) ** (2/3) * stellar_mass ** (1/3)  # AU
+    # Derived quantities, classes and indicators (shared with the batch version)
+    row = analyze_observations_batch(pd.DataFrame([params])).iloc[0]
+    planet_radius_est = row['planet_radius_est']
+    semi_major_axis = row['semi_major_axis']
+    duration_ratio = row['duration_ratio']
     
     print(f"\nInput Parameters:")
     print(f"  Orbital Period: {period:.1f} days")
@@ -42,34 +42,8 @@ def analyze_observation(params):
     print(f"\nDerived Properties:")
     print(f"  Estimated Planet Radius: {planet_radius_est:.2f} R⊕")
     print(f"  Estimated Orbital Distance: {semi_major_axis:.3f} AU")
-    
-    # Planet size classification
-    if planet_radius_est < 0.5:
-        size_class = "Sub-Earth (very small)"
-    elif planet_radius_est < 2:
-        size_class = "Earth to Super-Earth"
-    elif planet_radius_est < 6:
-        size_class = "Neptune-like"
-    elif planet_radius_est < 15:
-        size_class = "Jupiter-like (gas giant)"
-    else:
-        size_class = "Super-Jupiter (unlikely for planet)"
-    
-    print(f"  Size Classification: {size_class}")
-    
-    # Orbital classification
-    if semi_major_axis < 0.1:
-        orbit_class = "Very close orbit (Hot Jupiter/Neptune)"
-    elif semi_major_axis < 0.5:
-        orbit_class = "Close orbit (like Mercury)"
-    elif semi_major_axis < 1.5:
-        orbit_class = "Inner system (like Venus/Earth)"
-    elif semi_major_axis < 5:
-        orbit_class = "Outer system (like Mars/Jupiter)"
-    else:
-        orbit_class = "Far orbit"
-    
-    print(f"  Orbital Classification: {orbit_class}")
+    print(f"  Size Classification: {row['size_class']}")
+    print(f"  Orbital Classification: {row['orbit_class']}")
     
     # Detection quality
     print(f"\nDetection Quality Assessment:")
@@ -106,9 +80,6 @@ def analyze_observation(params):
         print(f"  ✓  Transit depth ({depth*100:.3f}%) is planet-like")
     
     # Duration/Period ratio
-    duration_days = duration / 24.0
-    duration_ratio = duration_days / period
-    
     if duration_ratio > 0.2:
         print(f"  ⚠️  Transit duration is very long relative to period")
         print(f"      → Unusual geometry, check for false positive")
@@ -118,49 +89,11 @@ def analyze_observation(params):
     
     # Overall assessment
     print(f"\nOverall Assessment:")
+    print(f"  Planet-like indicators: {row['planet_indicators']}/6")
+    print(f"  False positive indicators: {row['fp_indicators']}/4")
     
-    planet_indicators = 0
-    fp_indicators = 0
-    
-    # Positive indicators
-    if 0.0001 < depth < 0.05:
-        planet_indicators += 1
-    if 7 < snr < 100:
-        planet_indicators += 1
-    if 0.5 < planet_radius_est < 20:
-        planet_indicators += 1
-    if 0.01 < duration_ratio < 0.15:
-        planet_indicators += 1
-    if 3000 < stellar_temp < 8000:
-        planet_indicators += 1
-    if 0.5 < stellar_mass < 2.0:
-        planet_indicators += 1
-    
-    # Negative indicators
-    if depth > 0.05:
-        fp_indicators += 1
-    if snr < 7:
-        fp_indicators += 1
-    if planet_radius_est > 20:
-        fp_indicators += 1
-    if duration_ratio > 0.2:
-        fp_indicators += 1
-    
-    print(f"  Planet-like indicators: {planet_indicators}/6")
-    print(f"  False positive indicators: {fp_indicators}/4")
-    
-    if planet_indicators >= 5 and fp_indicators == 0:
-        print(f"\n  → Strong planet candidate")
-        print(f"     Expected: CONFIRMED_EXOPLANET")
-    elif planet_indicators >= 3 and fp_indicators <= 1:
-        print(f"\n  → Good planet candidate")
-        print(f"     Expected: CONFIRMED_EXOPLANET or PLANETARY_CANDIDATE")
-    elif planet_indicators >= 2:
-        print(f"\n  → Moderate planet candidate")
-        print(f"     Expected: PLANETARY_CANDIDATE")
-    else:
-        print(f"\n  → Uncertain or likely false positive")
-        print(f"     Expected: PLANETARY_CANDIDATE or FALSE_POSITIVE")
+    print(f"\n  → {row['assessment']}")
+    print(f"     Expected: {EXPECTED_CLASSES[row['assessment']]}")
     
     # Special notes
     print(f"\nSpecial Considerations:")
@@ -176,6 +109,99 @@ def analyze_observation(params):
     print("\n" + "="*70)
 
 
+SIZE_CLASSES = np.array([
+    "Sub-Earth (very small)",
+    "Earth to Super-Earth",
+    "Neptune-like",
+    "Jupiter-like (gas giant)",
+    "Super-Jupiter (unlikely for planet)"
+])
+
+ORBIT_CLASSES = np.array([
+    "Very close orbit (Hot Jupiter/Neptune)",
+    "Close orbit (like Mercury)",
+    "Inner system (like Venus/Earth)",
+    "Outer system (like Mars/Jupiter)",
+    "Far orbit"
+])
+
+
+# Classes the overall assessment points to, as shown by analyze_observation
+EXPECTED_CLASSES = {
+    "Strong planet candidate": "CONFIRMED_EXOPLANET",
+    "Good planet candidate": "CONFIRMED_EXOPLANET or PLANETARY_CANDIDATE",
+    "Moderate planet candidate": "PLANETARY_CANDIDATE",
+    "Uncertain or likely false positive": "PLANETARY_CANDIDATE or FALSE_POSITIVE"
+}
+
+
+def analyze_observations_batch(observations):
+    """
+    Derived properties and assessment for many observations at once
+    (analyze_observation prints the result for a single observation).
+    
+    Args:
+        observations: DataFrame (or dict of arrays) with the seven input columns
+    
+    Returns:
+        DataFrame with the derived properties, size/orbit classes, indicator
+        counts and overall assessment for each observation (no printing)
+    """
+    df = pd.DataFrame(observations)
+    period = df['orbital_period'].to_numpy(dtype=np.float64)
+    duration = df['transit_duration'].to_numpy(dtype=np.float64)
+    depth = df['transit_depth'].to_numpy(dtype=np.float64)
+    snr = df['snr'].to_numpy(dtype=np.float64)
+    stellar_mass = df['stellar_mass'].to_numpy(dtype=np.float64)
+    stellar_temp = df['stellar_temp'].to_numpy(dtype=np.float64)
+    
+    # Calculate derived quantities
+    stellar_radius = stellar_mass ** 0.8  # Solar radii
+    radius_ratio = np.sqrt(depth)
+    planet_radius_est = radius_ratio * stellar_radius * 109.1  # Earth radii
+    semi_major_axis = (period / 365.25) ** (2/3) * stellar_mass ** (1/3)  # AU
+    duration_ratio = (duration / 24.0) / period
+    
+    # Positive indicators
+    planet_indicators = (
+        ((depth > 0.0001) & (depth < 0.05)).astype(int)
+        + ((snr > 7) & (snr < 100))
+        + ((planet_radius_est > 0.5) & (planet_radius_est < 20))
+        + ((duration_ratio > 0.01) & (duration_ratio < 0.15))
+        + ((stellar_temp > 3000) & (stellar_temp < 8000))
+        + ((stellar_mass > 0.5) & (stellar_mass < 2.0))
+    )
+    
+    # Negative indicators
+    fp_indicators = (
+        (depth > 0.05).astype(int)
+        + (snr < 7)
+        + (planet_radius_est > 20)
+        + (duration_ratio > 0.2)
+    )
+    
+    assessment = np.select(
+        [(planet_indicators >= 5) & (fp_indicators == 0),
+         (planet_indicators >= 3) & (fp_indicators <= 1),
+         planet_indicators >= 2],
+        ["Strong planet candidate", "Good planet candidate", "Moderate planet candidate"],
+        default="Uncertain or likely false positive"
+    )
+    
+    return pd.DataFrame({
+        'stellar_radius': stellar_radius,
+        'radius_ratio': radius_ratio,
+        'planet_radius_est': planet_radius_est,
+        'semi_major_axis': semi_major_axis,
+        'duration_ratio': duration_ratio,
+        'size_class': SIZE_CLASSES[np.digitize(planet_radius_est, [0.5, 2, 6, 15])],
+        'orbit_class': ORBIT_CLASSES[np.digitize(semi_major_axis, [0.1, 0.5, 1.5, 5])],
+        'planet_indicators': planet_indicators,
+        'fp_indicators': fp_indicators,
+        'assessment': assessment
+    }, index=df.index)
+
+
 if __name__ == "__main__":
     # Example usage
     test_case = {
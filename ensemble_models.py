@@ -3,23 +3,29 @@ Ensemble model architecture for exoplanet classification and property prediction
 Implements multiple ML models with voting and uncertainty estimation.
 """
 
+import copy
+import json
+import os
+from functools import lru_cache
 import numpy as np
-import pandas as pd
+import joblib
+from joblib import Parallel, delayed
 from sklearn.ensemble import (
     RandomForestClassifier, 
-    GradientBoostingClassifier,
+    HistGradientBoostingClassifier,
     RandomForestRegressor,
-    GradientBoostingRegressor,
+    HistGradientBoostingRegressor,
     VotingClassifier
 )
+from sklearn.base import BaseEstimator, ClassifierMixin
 from sklearn.neural_network import MLPClassifier
-from sklearn.svm import SVC
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import cross_val_score, StratifiedKFold
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
+from sklearn.exceptions import NotFittedError
+from sklearn.utils.validation import check_is_fitted
+from threadpoolctl import threadpool_limits
 import warnings
-warnings.filterwarnings('ignore')
 
 try:
     import xgboost as xgb
@@ -35,6 +41,226 @@ except ImportError:
     LIGHTGBM_AVAILABLE = False
     print("Warning: LightGBM not available. Install with: pip install lightgbm")
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    print("Warning: Numba not available. Install with: pip install numba")
+
+
+if NUMBA_AVAILABLE:
+    # Serial on purpose: predictions are made concurrently from server threads
+    @njit(cache=True)
+    def _entropy_confidence(proba):
+        """Fused per-sample entropy and max probability of an (N, C) probability matrix."""
+        n_samples, n_classes = proba.shape
+        entropy = np.empty(n_samples)
+        confidence = np.empty(n_samples)
+        for i in range(n_samples):
+            s = 0.0
+            mx = proba[i, 0]
+            for c in range(n_classes):
+                p = proba[i, c]
+                s -= p * np.log(p + 1e-10)
+                if p > mx:
+                    mx = p
+            entropy[i] = s
+            confidence[i] = mx
+        return entropy, confidence
+
+
+@lru_cache(maxsize=None)
+def _detect_xgb_device():
+    """
+    Return 'cuda' if XGBoost can train on a GPU on this machine, else 'cpu'.
+    Probed on the first fit rather than on import, so loading saved models
+    does not pay for it.
+    """
+    if not XGBOOST_AVAILABLE or not xgb.build_info().get('USE_CUDA', False):
+        return 'cpu'
+    try:
+        # Tiny probe fit: XGBoost silently falls back to CPU when no GPU is
+        # usable, so check which device the trained booster actually used
+        probe = xgb.XGBClassifier(n_estimators=1, device='cuda')
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)  # "No visible GPU" notice
+            probe.fit(np.random.rand(16, 4), np.arange(16) % 2)
+        config = json.loads(probe.get_booster().save_config())
+        return 'cuda' if config['learner']['generic_param']['device'].startswith('cuda') else 'cpu'
+    except Exception:
+        return 'cpu'
+
+
+@lru_cache(maxsize=None)
+def _detect_lgb_device():
+    """
+    Return 'gpu' if LightGBM was built with GPU support and can use it, else 'cpu'.
+    Probed on the first large training set rather than on import, so loading
+    saved models does not pay for it.
+    """
+    if not LIGHTGBM_AVAILABLE:
+        return 'cpu'
+    try:
+        # Raises LightGBMError on CPU-only builds or when no OpenCL device exists
+        lgb.LGBMClassifier(n_estimators=1, device='gpu', verbose=-1).fit(
+            np.random.rand(16, 4), np.arange(16) % 2
+        )
+        return 'gpu'
+    except Exception:
+        return 'cpu'
+
+
+@lru_cache(maxsize=None)
+def _torch_cuda_available():
+    """
+    Whether PyTorch is installed and sees a CUDA GPU. PyTorch is optional and
+    only used to train the MLP member on a GPU, so it is imported here, on the
+    first large training set, rather than with this module.
+    """
+    try:
+        import torch
+    except ImportError:
+        return False
+    return torch.cuda.is_available()
+
+
+# Below this many training rows, host-device transfers outweigh GPU histogram speedups
+LGB_GPU_MIN_ROWS = 10_000
+
+# Below this many training rows, the MLP member trains on the CPU with sklearn
+TORCH_MLP_MIN_ROWS = 1_000
+
+# Below this many rows, member models are evaluated sequentially at prediction time
+PARALLEL_PREDICT_MIN_ROWS = 1_000
+
+# Inputs are additionally split into row chunks of about this size for prediction
+PREDICT_CHUNK_ROWS = 50_000
+
+
+def _threads_per_task(n_tasks):
+    """
+    Threads each of n_tasks models running concurrently on threads may use, so
+    that together (with their own thread pools) they use about one per core.
+    """
+    n_cpus = joblib.cpu_count()
+    return max(1, n_cpus // min(max(n_tasks, 1), n_cpus))
+
+
+def _call_limited(n_threads, func, *args):
+    """Call func(*args) with this thread's OpenMP pools capped to n_threads."""
+    with threadpool_limits(limits=n_threads, user_api='openmp'):
+        return func(*args)
+
+
+def _limited_copy(model, n_threads):
+    """
+    Shallow copy of a fitted model (sharing its fitted state) whose own n_jobs
+    is capped to n_threads, leaving the model used by other threads untouched.
+    """
+    if getattr(model, 'n_jobs', None) is None:
+        return model
+    model = copy.copy(model)
+    model.n_jobs = n_threads
+    return model
+
+
+class TorchMLPClassifier(BaseEstimator, ClassifierMixin):
+    """
+    PyTorch counterpart of the ensemble's MLPClassifier, trained on a CUDA GPU.
+    Mirrors its architecture (ReLU layers, Adam, L2 penalty) and its early
+    stopping on the accuracy of a held-out validation split.
+    """
+    
+    def __init__(self, hidden_layer_sizes=(128, 64, 32), alpha=1e-4, learning_rate_init=1e-3,
+                 batch_size=200, max_iter=500, validation_fraction=0.1, n_iter_no_change=10,
+                 random_state=42):
+        self.hidden_layer_sizes = hidden_layer_sizes
+        self.alpha = alpha
+        self.learning_rate_init = learning_rate_init
+        self.batch_size = batch_size
+        self.max_iter = max_iter
+        self.validation_fraction = validation_fraction
+        self.n_iter_no_change = n_iter_no_change
+        self.random_state = random_state
+    
+    def fit(self, X, y):
+        import torch
+        from torch import nn
+        
+        self.classes_, y_idx = np.unique(y, return_inverse=True)
+        X = np.asarray(X, dtype=np.float32)
+        
+        torch.manual_seed(self.random_state)
+        rng = np.random.default_rng(self.random_state)
+        device = 'cuda' if _torch_cuda_available() else 'cpu'
+        
+        # Hold out a validation split for early stopping
+        order = rng.permutation(len(X))
+        n_val = max(1, int(len(X) * self.validation_fraction))
+        X_train = torch.from_numpy(X[order[n_val:]]).to(device)
+        y_train = torch.from_numpy(y_idx[order[n_val:]]).long().to(device)
+        X_val = torch.from_numpy(X[order[:n_val]]).to(device)
+        y_val = torch.from_numpy(y_idx[order[:n_val]]).long().to(device)
+        
+        layers = []
+        n_in = X.shape[1]
+        for n_out in self.hidden_layer_sizes:
+            layers += [nn.Linear(n_in, n_out), nn.ReLU()]
+            n_in = n_out
+        layers.append(nn.Linear(n_in, len(self.classes_)))
+        model = nn.Sequential(*layers).to(device)
+        
+        optimizer = torch.optim.Adam(model.parameters(), lr=self.learning_rate_init,
+                                     weight_decay=self.alpha)
+        loss_fn = nn.CrossEntropyLoss()
+        
+        best_score, best_state, stale = -1.0, None, 0
+        for _ in range(self.max_iter):
+            model.train()
+            for batch in torch.randperm(len(X_train), device=device).split(self.batch_size):
+                optimizer.zero_grad()
+                loss_fn(model(X_train[batch]), y_train[batch]).backward()
+                optimizer.step()
+            
+            model.eval()
+            with torch.no_grad():
+                score = (model(X_val).argmax(dim=1) == y_val).float().mean().item()
+            if score > best_score:
+                best_score, stale = score, 0
+                best_state = {k: v.detach().clone() for k, v in model.state_dict().items()}
+            else:
+                stale += 1
+                if stale >= self.n_iter_no_change:
+                    break
+        
+        model.load_state_dict(best_state)
+        self.model_ = model.eval()
+        return self
+    
+    def predict_proba(self, X):
+        import torch
+        
+        device = next(self.model_.parameters()).device
+        with torch.no_grad():
+            logits = self.model_(torch.as_tensor(np.asarray(X, dtype=np.float32), device=device))
+            return logits.softmax(dim=1).cpu().numpy().astype(np.float64)
+    
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+    
+    def __getstate__(self):
+        # Pickle the network on the CPU so saved models load on machines without a GPU
+        state = dict(super().__getstate__())
+        if 'model_' in state:
+            state['model_'] = copy.deepcopy(state['model_']).cpu()
+        return state
+    
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        if 'model_' in state and _torch_cuda_available():
+            self.model_.cuda()
+
 
 class ExoplanetEnsembleClassifier:
     """
@@ -64,12 +290,12 @@ class ExoplanetEnsembleClassifier:
             n_jobs=-1
         )
         
-        # Gradient Boosting - sequential error correction
-        self.models['gb'] = GradientBoostingClassifier(
-            n_estimators=150,
+        # Gradient Boosting - sequential error correction (histogram-based)
+        self.models['gb'] = HistGradientBoostingClassifier(
+            max_iter=150,
             learning_rate=0.05,
             max_depth=7,
-            subsample=0.8,
+            early_stopping=True,
             random_state=42
         )
         
@@ -101,6 +327,8 @@ class ExoplanetEnsembleClassifier:
                 subsample=0.8,
                 colsample_bytree=0.8,
                 objective='multi:softmax',
+                tree_method='hist',
+                device='cpu',
                 random_state=42,
                 n_jobs=-1
             )
@@ -124,11 +352,20 @@ class ExoplanetEnsembleClassifier:
         # Encode labels
         y_encoded = self.label_encoder.fit_transform(y)
         self.classes_ = self.label_encoder.classes_
+        self._classes_arr = np.asarray(self.classes_)
         
-        # Train individual models
-        for name, model in self.models.items():
-            print(f"  Training {name.upper()}...")
-            model.fit(X, y_encoded)
+        # Train XGBoost on the GPU when one is available
+        if 'xgb' in self.models:
+            self.models['xgb'].set_params(device=_detect_xgb_device())
+        
+        # Build LightGBM histograms on the GPU (single precision) for large training sets
+        if 'lgb' in self.models and len(X) >= LGB_GPU_MIN_ROWS and _detect_lgb_device() != 'cpu':
+            self.models['lgb'].set_params(device=_detect_lgb_device(), gpu_use_dp=False)
+        
+        # Train the neural network with PyTorch on the GPU when one is available
+        if isinstance(self.models.get('mlp'), MLPClassifier) and len(X) >= TORCH_MLP_MIN_ROWS \
+                and _torch_cuda_available():
+            self.models['mlp'] = TorchMLPClassifier(random_state=42)
         
         # Create voting ensemble with soft voting
         estimators = [(name, model) for name, model in self.models.items()]
@@ -138,57 +375,96 @@ class ExoplanetEnsembleClassifier:
             n_jobs=-1
         )
         
-        # Fit ensemble
-        print("  Training ensemble...")
+        # Fit ensemble (trains every model once, in parallel)
+        print(f"  Training {', '.join(name.upper() for name in self.models)}...")
         self.ensemble.fit(X, y_encoded)
         
+        # Expose the fitted members so per-model predictions reuse them
+        self.models = dict(zip(self.models.keys(), self.ensemble.estimators_))
+        
         print("Ensemble training complete!")
         return self
     
+    def _class_labels(self):
+        """Class labels indexed by encoded class."""
+        # Ensembles saved before the lookup array existed don't have it yet
+        classes_arr = getattr(self, '_classes_arr', None)
+        if classes_arr is None:
+            classes_arr = self._classes_arr = np.asarray(self.classes_)
+        return classes_arr
+    
+    def _member_probas(self, X):
+        """
+        Class probabilities from every member model, shape (n_models, n_samples, n_classes).
+        Members write into one preallocated float32 tensor.
+        """
+        models = list(self.models.values())
+        probs = np.empty((len(models), len(X), len(self.classes_)), dtype=np.float32)
+        
+        def fill(i, model, start, end):
+            probs[i, start:end] = model.predict_proba(X[start:end])
+        
+        # Tiny requests stay sequential to avoid thread dispatch overhead
+        if len(X) < PARALLEL_PREDICT_MIN_ROWS:
+            for i, model in enumerate(models):
+                probs[i] = model.predict_proba(X)
+            return probs
+        
+        # Members (and, for very large inputs, row chunks of X) run concurrently
+        # on threads; their predict code releases the GIL. Each task gets an
+        # equal share of the cores for its own thread pools
+        n_chunks = min(os.cpu_count() or 1, max(1, len(X) // PREDICT_CHUNK_ROWS))
+        bounds = np.linspace(0, len(X), n_chunks + 1).astype(int)
+        
+        n_threads = _threads_per_task(len(models) * n_chunks)
+        models = [_limited_copy(model, n_threads) for model in models]
+        Parallel(n_jobs=-1, prefer='threads')(
+            delayed(_call_limited)(n_threads, fill, i, model, start, end)
+            for i, model in enumerate(models)
+            for start, end in zip(bounds[:-1], bounds[1:])
+        )
+        return probs
+    
     def predict(self, X):
         """Predict class labels."""
-        y_encoded = self.ensemble.predict(X)
-        return self.label_encoder.inverse_transform(y_encoded)
+        return self._class_labels()[self.predict_proba(X).argmax(axis=1)]
     
     def predict_proba(self, X):
-        """Predict class probabilities."""
-        return self.ensemble.predict_proba(X)
+        """Predict class probabilities (soft vote: mean of member probabilities)."""
+        return self._member_probas(X).mean(axis=0, dtype=np.float64)
     
-    def predict_with_uncertainty(self, X):
+    def predict_with_uncertainty(self, X, return_agreement=False):
         """
         Predict with uncertainty estimation.
         Returns predictions, probabilities, and uncertainty metrics.
+        Model agreement is only computed when return_agreement is True
+        (otherwise 'model_agreement' is None).
         """
-        # Get predictions from all models
-        all_predictions = []
-        all_probabilities = []
-        
-        for name, model in self.models.items():
-            pred_encoded = model.predict(X)
-            all_predictions.append(pred_encoded)
-            
-            if hasattr(model, 'predict_proba'):
-                proba = model.predict_proba(X)
-                all_probabilities.append(proba)
+        # Get probabilities from all models (each model is evaluated once)
+        all_probabilities = self._member_probas(X)
         
         # Ensemble prediction
-        ensemble_pred_encoded = self.ensemble.predict(X)
-        ensemble_pred = self.label_encoder.inverse_transform(ensemble_pred_encoded)
-        ensemble_proba = self.ensemble.predict_proba(X)
+        ensemble_proba = all_probabilities.mean(axis=0, dtype=np.float64)
+        ensemble_pred = self._class_labels()[ensemble_proba.argmax(axis=1)]
         
         # Calculate uncertainty metrics
-        # 1. Agreement among models
-        all_predictions = np.array(all_predictions)
-        agreement = np.mean([np.mean(all_predictions == pred) 
-                            for pred in all_predictions])
+        # 1. Agreement among models: mean pairwise agreement of the member
+        #    predictions, from per-sample vote counts
+        agreement = None
+        if return_agreement:
+            n_models, n_samples, n_classes = all_probabilities.shape
+            all_predictions = all_probabilities.argmax(axis=2)
+            votes = (all_predictions[:, :, None] == np.arange(n_classes)).sum(axis=0)
+            agreement = np.sum(votes ** 2) / (n_models * n_models * n_samples)
         
-        # 2. Entropy of probability distribution
-        entropy = -np.sum(ensemble_proba * np.log(ensemble_proba + 1e-10), axis=1)
-        max_entropy = np.log(len(self.classes_))
-        normalized_entropy = entropy / max_entropy
-        
-        # 3. Confidence (max probability)
-        confidence = np.max(ensemble_proba, axis=1)
+        # 2. Entropy of probability distribution and 3. confidence (max probability)
+        if NUMBA_AVAILABLE:
+            entropy, confidence = _entropy_confidence(ensemble_proba)
+        else:
+            # Fused multiply-and-reduce, no (N, C) product temporary
+            entropy = -np.einsum('ij,ij->i', ensemble_proba, np.log(ensemble_proba + 1e-10))
+            confidence = np.max(ensemble_proba, axis=1)
+        normalized_entropy = entropy * (1.0 / np.log(len(self.classes_)))
         
         return {
             'predictions': ensemble_pred,
@@ -224,6 +500,18 @@ class ExoplanetEnsembleClassifier:
             print(f"  {name.upper()}: {acc:.4f}")
         
         return accuracy_score(y, predictions)
+    
+    def save(self, path):
+        """Save the fitted ensemble (uncompressed, so it can be memory-mapped on load)."""
+        joblib.dump(self, path)
+    
+    @staticmethod
+    def load(path):
+        """
+        Load an ensemble saved with save(). Large arrays are memory-mapped
+        read-only, so processes loading the same file share them via the page cache.
+        """
+        return joblib.load(path, mmap_mode='r')
 
 
 class ExoplanetPropertyRegressors:
@@ -255,12 +543,12 @@ class ExoplanetPropertyRegressors:
                 n_jobs=-1
             )
             
-            # Gradient Boosting Regressor
-            self.regressors[property_name]['gb'] = GradientBoostingRegressor(
-                n_estimators=150,
+            # Gradient Boosting Regressor (histogram-based)
+            self.regressors[property_name]['gb'] = HistGradientBoostingRegressor(
+                max_iter=150,
                 learning_rate=0.05,
                 max_depth=7,
-                subsample=0.8,
+                early_stopping=True,
                 random_state=42
             )
             
@@ -271,34 +559,36 @@ class ExoplanetPropertyRegressors:
                     learning_rate=0.05,
                     max_depth=8,
                     subsample=0.8,
+                    tree_method='hist',
+                    device='cpu',
                     random_state=42,
                     n_jobs=-1
                 )
     
-    def fit(self, X, y_dict):
-        """
-        Train regressors for all properties.
-        
-        Args:
-            X: Feature matrix
-            y_dict: Dictionary with keys 'planet_radius', 'planet_temp', etc.
-        """
-        print("\nTraining property regressors...")
-        
+    def _flat_models(self):
+        """All (property, model name, model) triples as one flat list, grouped by property."""
+        return [
+            (property_name, name, model)
+            for property_name, models in self.regressors.items()
+            for name, model in models.items()
+        ]
+    
+    def _training_sets(self, X, y_dict):
+        """Valid (X, y) training rows for every property present in y_dict."""
+        training_sets = {}
         for property_name in self.regressors.keys():
             if property_name not in y_dict:
                 continue
             
-            y = y_dict[property_name]
-            
             # Convert to numpy array and ensure real values
-            y = np.array(y, dtype=np.float64)
-            if np.iscomplexobj(y):
-                y = np.real(y)
+            y = np.asarray(y_dict[property_name])
+            if y.dtype.kind == 'c':
+                y = y.real
+            y = np.asarray(y, dtype=np.float64)
             
-            # Remove NaN and inf values
-            valid_idx = ~(np.isnan(y) | np.isinf(y))
-            if not np.any(valid_idx):
+            # Remove NaN and inf values in one pass
+            valid_idx = np.isfinite(y)
+            if not valid_idx.any():
                 continue
             
             X_valid = X[valid_idx]
@@ -309,16 +599,132 @@ class ExoplanetPropertyRegressors:
                 continue
             
             print(f"  Training {property_name} regressors...")
+            training_sets[property_name] = (X_valid, y_valid)
+        
+        return training_sets
+    
+    def _fit_models(self, training_sets, fit_model):
+        """Run fit_model(model, X, y) for every (property, model) pair concurrently."""
+        def fit_one(model, X_valid, y_valid):
             try:
-                for name, model in self.regressors[property_name].items():
-                    model.fit(X_valid, y_valid)
+                fit_model(model, X_valid, y_valid)
             except Exception as e:
-                print(f"    Warning: Failed to train {name} for {property_name}: {e}")
-                continue
+                return e
+        
+        tasks = [task for task in self._flat_models() if task[0] in training_sets]
+        for _, name, model in tasks:
+            if name == 'xgb':
+                model.set_params(device=_detect_xgb_device())
+        
+        # Models train concurrently on threads, each with an equal share of the
+        # cores for its own thread pools (its n_jobs is restored afterwards)
+        n_threads = _threads_per_task(len(tasks))
+        n_jobs = {id(model): model.n_jobs for _, _, model in tasks if 'n_jobs' in model.get_params()}
+        try:
+            for _, _, model in tasks:
+                if id(model) in n_jobs:
+                    model.set_params(n_jobs=n_threads)
+            errors = Parallel(n_jobs=-1, prefer='threads')(
+                delayed(_call_limited)(n_threads, fit_one, model, *training_sets[property_name])
+                for property_name, _, model in tasks
+            )
+        finally:
+            for _, _, model in tasks:
+                if id(model) in n_jobs:
+                    model.set_params(n_jobs=n_jobs[id(model)])
+        for (property_name, name, _), error in zip(tasks, errors):
+            if error is not None:
+                print(f"    Warning: Failed to train {name} for {property_name}: {error}")
+    
+    def fit(self, X, y_dict):
+        """
+        Train regressors for all properties.
+        
+        Args:
+            X: Feature matrix
+            y_dict: Dictionary with keys 'planet_radius', 'planet_temp', etc.
+        """
+        print("\nTraining property regressors...")
+        
+        # Slice the valid training rows once per property, then fit every
+        # (property, model) pair concurrently
+        self._fit_models(self._training_sets(X, y_dict), lambda model, X, y: model.fit(X, y))
         
         print("Property regressor training complete!")
         return self
     
+    @staticmethod
+    def _add_rounds(model, X, y, n_rounds):
+        """
+        Grow an already fitted model by n_rounds trees/iterations trained on (X, y).
+        The hyperparameters changed for the update are restored afterwards, so
+        a later fit() still retrains the model from scratch.
+        """
+        params = model.get_params()
+        try:
+            if XGBOOST_AVAILABLE and isinstance(model, xgb.XGBModel):
+                # Continue boosting from the existing booster
+                booster = model.get_booster()
+                model.set_params(n_estimators=n_rounds)
+                model.fit(X, y, xgb_model=booster)
+            elif 'max_iter' in params:
+                model.set_params(warm_start=True, max_iter=model.n_iter_ + n_rounds)
+                model.fit(X, y)
+            else:
+                model.set_params(warm_start=True, n_estimators=len(model.estimators_) + n_rounds)
+                model.fit(X, y)
+        finally:
+            model.set_params(**{key: params[key] for key in ('warm_start', 'n_estimators', 'max_iter')
+                                if key in params})
+    
+    def partial_fit(self, X, y_dict, n_rounds=50):
+        """
+        Update the regressors with new data without retraining from scratch.
+        Fitted models keep their trees and add n_rounds new ones trained on
+        (X, y_dict); models that were never fitted are trained normally.
+        """
+        print("\nUpdating property regressors...")
+        
+        def update(model, X, y):
+            try:
+                check_is_fitted(model)
+            except NotFittedError:
+                model.fit(X, y)
+                return
+            self._add_rounds(model, X, y, n_rounds)
+        
+        self._fit_models(self._training_sets(X, y_dict), update)
+        
+        print("Property regressor update complete!")
+        return self
+    
+    def _model_predictions(self, X, parallel=None):
+        """
+        Predictions of every model, shape (n_models, n_samples), in _flat_models()
+        order, together with the row range of each property. Models run on
+        threads when parallel is True (by default: for inputs of at least
+        PARALLEL_PREDICT_MIN_ROWS rows).
+        """
+        tasks = self._flat_models()
+        if parallel is None:
+            parallel = len(X) >= PARALLEL_PREDICT_MIN_ROWS
+        if not parallel:
+            preds = [model.predict(X) for _, _, model in tasks]
+        else:
+            n_threads = _threads_per_task(len(tasks))
+            preds = Parallel(n_jobs=-1, prefer='threads')(
+                delayed(_call_limited)(n_threads, _limited_copy(model, n_threads).predict, X)
+                for _, _, model in tasks
+            )
+        
+        bounds = {}
+        start = 0
+        for property_name, models in self.regressors.items():
+            bounds[property_name] = (start, start + len(models))
+            start += len(models)
+        
+        return (np.stack(preds) if preds else None), bounds
+    
     def predict(self, X):
         """
         Predict all planet properties.
@@ -326,41 +732,30 @@ class ExoplanetPropertyRegressors:
         """
         predictions = {}
         
-        for property_name, models in self.regressors.items():
-            if len(models) == 0:
-                predictions[property_name] = None
-                continue
-            
+        all_preds, bounds = self._model_predictions(X)
+        
+        for property_name, (start, end) in bounds.items():
             # Average predictions from all models
-            property_preds = []
-            for model in models.values():
-                pred = model.predict(X)
-                property_preds.append(pred)
-            
-            predictions[property_name] = np.mean(property_preds, axis=0)
+            predictions[property_name] = np.mean(all_preds[start:end], axis=0) if end > start else None
         
         return predictions
     
-    def predict_with_uncertainty(self, X):
+    def predict_with_uncertainty(self, X, parallel=None):
         """
         Predict properties with uncertainty estimation.
         """
         predictions = {}
         uncertainties = {}
         
-        for property_name, models in self.regressors.items():
-            if len(models) == 0:
+        all_preds, bounds = self._model_predictions(X, parallel)
+        
+        for property_name, (start, end) in bounds.items():
+            if start == end:
                 predictions[property_name] = None
                 uncertainties[property_name] = None
                 continue
             
-            # Get predictions from all models
-            property_preds = []
-            for model in models.values():
-                pred = model.predict(X)
-                property_preds.append(pred)
-            
-            property_preds = np.array(property_preds)
+            property_preds = all_preds[start:end]
             
             # Mean prediction
             predictions[property_name] = np.mean(property_preds, axis=0)
@@ -393,7 +788,13 @@ if __name__ == "__main__":
         X, y, test_size=0.2, random_state=42, stratify=y
     )
     
-    # Train classifier
-    classifier = ExoplanetEnsembleClassifier()
-    classifier.fit(X_train, y_train)
+    # Train classifier (reuse a previously saved ensemble if present)
+    cache_path = 'ensemble.joblib'
+    if os.path.exists(cache_path):
+        print(f"Loading cached ensemble from {cache_path}")
+        classifier = ExoplanetEnsembleClassifier.load(cache_path)
+    else:
+        classifier = ExoplanetEnsembleClassifier()
+        classifier.fit(X_train, y_train)
+        classifier.save(cache_path)
     classifier.evaluate(X_test, y_test)
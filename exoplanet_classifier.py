@@ -4,18 +4,52 @@ Main exoplanet classification system.
 Trains models and provides terminal interface for predictions.
 """
 
+import contextlib
+import copy
+import json
 import numpy as np
 import pandas as pd
 import joblib
 import os
+import pickle
 import sys
-from sklearn.model_selection import train_test_split
+import threading
+from collections import OrderedDict
 import warnings
-warnings.filterwarnings('ignore')
+
+# Optional: compresses saved models with lz4 (zlib is used silently otherwise,
+# so importing this module never writes to stdout)
+try:
+    import lz4
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
 
 from data_preprocessing import load_nasa_exoplanet_data, ExoplanetDataPreprocessor
 from feature_engineering import TransitFeatureEngineering, calculate_planet_properties
-from ensemble_models import ExoplanetEnsembleClassifier, ExoplanetPropertyRegressors
+from model_improvements import get_corrected_classification
+
+# Number of recent single-observation predictions kept by predict()
+PREDICT_CACHE_SIZE = 1024
+
+# Rows scored per batch by the 'stream' command
+STREAM_CHUNK_ROWS = 10_000
+
+
+def _mae_rmse(y_true, y_pred):
+    """
+    Per-column MAE and RMSE of two (N, P) arrays over the rows where neither
+    value is NaN, computed for all P columns at once. Returns
+    ``(mae, rmse, count)`` arrays; columns with no valid pairs have count 0.
+    """
+    diff = np.asarray(y_pred, dtype=np.float64) - np.asarray(y_true, dtype=np.float64)
+    keep = ~np.isnan(diff)
+    count = keep.sum(axis=0)
+    diff = np.where(keep, diff, 0.0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mae = np.abs(diff).sum(axis=0) / count
+        rmse = np.sqrt(np.einsum('ij,ij->j', diff, diff) / count)
+    return mae, rmse, count
 
 
 class ExoplanetClassificationSystem:
@@ -23,7 +57,14 @@ class ExoplanetClassificationSystem:
     Complete exoplanet classification system with training and prediction.
     """
     
-    def __init__(self):
+    def __init__(self, fast_load=False):
+        """
+        Args:
+            fast_load: save models uncompressed and memory-map their arrays on
+                load (fast startup, pages shared between processes) instead of
+                compressing them on disk
+        """
+        self.fast_load = fast_load
         self.preprocessor = ExoplanetDataPreprocessor()
         self.feature_engineer = TransitFeatureEngineering()
         self.classifier = None
@@ -33,11 +74,19 @@ class ExoplanetClassificationSystem:
             'snr', 'stellar_mass', 'stellar_temp', 'stellar_magnitude'
         ]
         self.is_trained = False
+        self._class_names = None
+        self._predict_cache = OrderedDict()
+        self._predict_cache_lock = threading.Lock()
     
     def train(self, df=None, save_models=True):
         """
         Train the complete classification system.
         """
+        # Training-only dependencies are imported here to keep prediction
+        # startup light (saved models import ensemble_models when unpickled)
+        from sklearn.model_selection import train_test_split
+        from ensemble_models import ExoplanetEnsembleClassifier, ExoplanetPropertyRegressors
+        
         print("="*70)
         print("EXOPLANET CLASSIFICATION SYSTEM - TRAINING")
         print("="*70)
@@ -72,24 +121,25 @@ class ExoplanetClassificationSystem:
         print("\n" + "-"*70)
         print("STEP 2: Train-Test Split")
         print("-"*70)
-        X_train, X_test, y_train, y_test = train_test_split(
-            X_engineered, y, test_size=0.2, random_state=42, stratify=y
+        # Row positions are split alongside, so property targets are indexed
+        # with plain integer arrays
+        X_train, X_test, y_train, y_test, train_pos, test_pos = train_test_split(
+            X_engineered, y, np.arange(len(y)), test_size=0.2, random_state=42, stratify=y
         )
         print(f"Training set: {len(X_train)} samples")
         print(f"Test set: {len(X_test)} samples")
         
         # Split property targets
-        train_idx = X_train.index
-        test_idx = X_test.index
-        
-        y_props_train = {k: v[train_idx] for k, v in y_properties.items()}
-        y_props_test = {k: v[test_idx] for k, v in y_properties.items()}
+        y_props_train = {k: v[train_pos] for k, v in y_properties.items()}
+        y_props_test = {k: v[test_pos] for k, v in y_properties.items()}
         
         print("\n" + "-"*70)
         print("STEP 3: Training Classification Ensemble")
         print("-"*70)
         self.classifier = ExoplanetEnsembleClassifier(use_advanced_models=True)
-        self.classifier.fit(X_train, y_train)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)  # incl. MLP ConvergenceWarning
+            self.classifier.fit(X_train, y_train)
         
         # Evaluate classifier
         print("\nEvaluating on test set...")
@@ -99,7 +149,9 @@ class ExoplanetClassificationSystem:
         print("STEP 4: Training Property Regressors")
         print("-"*70)
         self.regressors = ExoplanetPropertyRegressors(use_advanced_models=True)
-        self.regressors.fit(X_train, y_props_train)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            self.regressors.fit(X_train, y_props_train)
         
         # Evaluate regressors on confirmed exoplanets only
         print("\nEvaluating property predictions...")
@@ -108,23 +160,18 @@ class ExoplanetClassificationSystem:
             X_test_confirmed = X_test[confirmed_mask]
             props_pred, props_uncert = self.regressors.predict_with_uncertainty(X_test_confirmed)
             
-            # Get indices of confirmed exoplanets in the test set
-            test_indices = y_test.index[confirmed_mask]
-            
-            for prop_name in y_properties.keys():
-                y_true = y_props_test[prop_name][confirmed_mask]
-                y_pred_all = props_pred[prop_name]
-                
-                # Remove NaN values
-                valid = ~(np.isnan(y_true) | np.isnan(y_pred_all))
-                if np.any(valid):
-                    y_pred = y_pred_all[valid]
-                    y_true_valid = y_true[valid]
-                    mae = np.mean(np.abs(y_pred - y_true_valid))
-                    rmse = np.sqrt(np.mean((y_pred - y_true_valid) ** 2))
-                    print(f"  {prop_name}: MAE={mae:.4f}, RMSE={rmse:.4f}")
+            prop_names = list(y_properties.keys())
+            mae, rmse, count = _mae_rmse(
+                np.column_stack([y_props_test[p][confirmed_mask] for p in prop_names]),
+                np.column_stack([props_pred[p] for p in prop_names])
+            )
+            for prop_name, prop_mae, prop_rmse, n in zip(prop_names, mae, rmse, count):
+                if n > 0:
+                    print(f"  {prop_name}: MAE={prop_mae:.4f}, RMSE={prop_rmse:.4f}")
         
         self.is_trained = True
+        self._class_names = [str(c) for c in self.classifier.classes_]
+        self._predict_cache.clear()
         
         # Save models
         if save_models:
@@ -185,12 +232,32 @@ class ExoplanetClassificationSystem:
         # Extract input features in correct order
         X = input_df[self.feature_cols]
         
+        # Repeated queries (the exact same input values) are answered from the
+        # cache; callers get a copy they may modify
+        key = (return_uncertainty, X.iloc[0].to_numpy(dtype=np.float64).tobytes())
+        with self._predict_cache_lock:
+            cached = self._predict_cache.get(key)
+            if cached is not None:
+                self._predict_cache.move_to_end(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        
+        result = self._predict_uncached(X, input_params, return_uncertainty)
+        
+        with self._predict_cache_lock:
+            self._predict_cache[key] = result
+            if len(self._predict_cache) > PREDICT_CACHE_SIZE:
+                self._predict_cache.popitem(last=False)
+        return copy.deepcopy(result)
+    
+    def _predict_uncached(self, X, input_params, return_uncertainty):
+        """Run the full prediction pipeline for the first row of X."""
         # Feature engineering
         X_engineered = self.feature_engineer.transform(X)
         
         # Classification
         if return_uncertainty:
-            results = self.classifier.predict_with_uncertainty(X_engineered)
+            results = self.classifier.predict_with_uncertainty(X_engineered, return_agreement=True)
             classification = results['predictions'][0]
             probabilities = results['probabilities'][0]
             confidence = results['confidence'][0]
@@ -208,62 +275,161 @@ class ExoplanetClassificationSystem:
         # Only predict properties for planets, NOT for false positives
         if classification == 'confirmed_exoplanet' or classification == 'planetary_candidate':
             try:
-                props_pred, props_uncert = self.regressors.predict_with_uncertainty(X_engineered)
-                
-                properties = {
-                    'planet_radius': float(props_pred['planet_radius'][0]),
-                    'planet_temp': float(props_pred['planet_temp'][0]),
-                    'semi_major_axis': float(props_pred['semi_major_axis'][0]),
-                    'impact_parameter': float(props_pred['impact_parameter'][0])
-                }
+                # Even for one row the property models are worth running
+                # concurrently: each is a separate multi-millisecond call
+                props_pred, props_uncert = self.regressors.predict_with_uncertainty(
+                    X_engineered, parallel=(os.cpu_count() or 1) > 1
+                )
                 
+                properties = self._property_row(props_pred, 0)
                 if return_uncertainty:
-                    property_uncertainties = {
-                        'planet_radius': float(props_uncert['planet_radius'][0]),
-                        'planet_temp': float(props_uncert['planet_temp'][0]),
-                        'semi_major_axis': float(props_uncert['semi_major_axis'][0]),
-                        'impact_parameter': float(props_uncert['impact_parameter'][0])
-                    }
+                    property_uncertainties = self._property_row(props_uncert, 0)
             except Exception as e:
                 print(f"Warning: Could not predict properties: {e}")
                 properties = None
         
+        return self._build_result(
+            classification, probabilities, confidence,
+            uncertainty if return_uncertainty else None,
+            results['model_agreement'] if return_uncertainty else None,
+            properties, property_uncertainties, input_params
+        )
+    
+    def predict_many(self, input_features, return_uncertainty=True):
+        """
+        Make predictions for a batch of observations in a single pass.
+        
+        Feature engineering, the classifier ensemble and the property regressors
+        each run once over the whole batch instead of once per observation.
+        
+        Args:
+            input_features: DataFrame, list of dicts, or (N, 7) array with columns
+                in ``feature_cols`` order
+            return_uncertainty: whether to include uncertainty estimates
+        
+        Returns:
+            list of result dicts, one per observation (same format as predict)
+        """
+        if not self.is_trained:
+            raise ValueError("Model not trained. Call train() first or load_models().")
+        
+        # Convert input to DataFrame
+        if isinstance(input_features, pd.DataFrame):
+            input_df = input_features
+        elif isinstance(input_features, list):
+            input_df = pd.DataFrame(input_features)
+        else:
+            input_df = pd.DataFrame(
+                np.asarray(input_features, dtype=np.float64).reshape(-1, len(self.feature_cols)),
+                columns=self.feature_cols
+            )
+        
+        # Validate input features
+        for col in self.feature_cols:
+            if col not in input_df.columns:
+                raise ValueError(f"Missing required feature: {col}")
+        
+        if len(input_df) == 0:
+            return []
+        
+        # Extract input features in correct order
+        X = input_df[self.feature_cols]
+        input_params = X.to_dict('records')
+        
+        # Feature engineering
+        X_engineered = self.feature_engineer.transform(X)
+        
+        # Classification
+        if return_uncertainty:
+            results = self.classifier.predict_with_uncertainty(X_engineered)
+            classifications = results['predictions']
+            probabilities = results['probabilities']
+            confidences = results['confidence']
+            uncertainties = results['uncertainty']
+        else:
+            classifications = self.classifier.predict(X_engineered)
+            probabilities = self.classifier.predict_proba(X_engineered)
+            confidences = np.max(probabilities, axis=1)
+            uncertainties = None
+        
+        # Property prediction for planet-like rows only, in one regressor pass
+        planet_rows = np.flatnonzero(
+            np.isin(classifications, ['confirmed_exoplanet', 'planetary_candidate'])
+        )
+        props_pred, props_uncert = None, None
+        if len(planet_rows) > 0:
+            try:
+                props_pred, props_uncert = self.regressors.predict_with_uncertainty(
+                    X_engineered.iloc[planet_rows]
+                )
+            except Exception as e:
+                print(f"Warning: Could not predict properties: {e}")
+        
+        predictions = []
+        planet_pos = {row: pos for pos, row in enumerate(planet_rows)}
+        for i in range(len(X)):
+            properties = None
+            property_uncertainties = None
+            if props_pred is not None and i in planet_pos:
+                properties = self._property_row(props_pred, planet_pos[i])
+                if return_uncertainty:
+                    property_uncertainties = self._property_row(props_uncert, planet_pos[i])
+            
+            predictions.append(self._build_result(
+                classifications[i], probabilities[i], confidences[i],
+                uncertainties[i] if return_uncertainty else None,
+                None, properties, property_uncertainties, input_params[i]
+            ))
+        
+        return predictions
+    
+    @staticmethod
+    def _property_row(props, i):
+        """Extract the properties of a single observation from batched regressor output."""
+        return {
+            'planet_radius': float(props['planet_radius'][i]),
+            'planet_temp': float(props['planet_temp'][i]),
+            'semi_major_axis': float(props['semi_major_axis'][i]),
+            'impact_parameter': float(props['impact_parameter'][i])
+        }
+    
+    def _build_result(self, classification, probabilities, confidence, uncertainty,
+                      model_agreement, properties, property_uncertainties, input_params):
+        """
+        Assemble the result dictionary for one observation and apply the
+        confirmation score correction.
+        """
         # Build result dictionary
         result = {
             'classification': classification,
             'confidence': float(confidence)
         }
         
-        if return_uncertainty:
+        if uncertainty is not None:
             result['uncertainty'] = float(uncertainty)
-            result['model_agreement'] = float(results['model_agreement'])
+        if model_agreement is not None:
+            result['model_agreement'] = float(model_agreement)
         
-        # Add class probabilities
-        result['class_probabilities'] = {
-            cls: float(prob) 
-            for cls, prob in zip(self.classifier.classes_, probabilities)
-        }
+        # Add class probabilities (tolist() converts to Python floats in bulk)
+        result['class_probabilities'] = dict(zip(self._class_names, probabilities.tolist()))
         
         # Apply confirmation score correction ONLY for borderline cases
-        # Don't override clear false positives!
-        try:
-            from model_improvements import get_corrected_classification
-            corrected_result, conf_score = get_corrected_classification(result, input_params)
-            
-            # Only use correction if:
-            # 1. Original was NOT false_positive with high confidence
-            # 2. Correction significantly improves confidence
-            original_fp_confidence = result['class_probabilities'].get('false_positive', 0)
-            
-            if (corrected_result['classification'] == 'confirmed_exoplanet' and 
-                corrected_result['confidence'] > result['confidence'] + 0.15 and
-                original_fp_confidence < 0.6):  # Don't override clear false positives
-                original_class = result['classification']
-                result = corrected_result
-                result['original_classification'] = original_class
-                result['correction_applied'] = True
-        except:
-            pass  # If correction fails, use original result
+        # Don't override clear false positives! (checked first, so the
+        # correction is not computed for rows where it could never apply)
+        original_fp_confidence = result['class_probabilities'].get('false_positive', 0)
+        if original_fp_confidence < 0.6:
+            try:
+                corrected_result, conf_score = get_corrected_classification(result, input_params)
+                
+                # Only use correction if it significantly improves confidence
+                if (corrected_result['classification'] == 'confirmed_exoplanet' and 
+                    corrected_result['confidence'] > result['confidence'] + 0.15):
+                    original_class = result['classification']
+                    result = corrected_result
+                    result['original_classification'] = original_class
+                    result['correction_applied'] = True
+            except:
+                pass  # If correction fails, use original result
         
         if properties is not None:
             result['properties'] = properties
@@ -276,21 +442,42 @@ class ExoplanetClassificationSystem:
         """Save trained models to disk."""
         os.makedirs(directory, exist_ok=True)
         
-        joblib.dump(self.preprocessor, os.path.join(directory, 'preprocessor.pkl'))
-        joblib.dump(self.feature_engineer, os.path.join(directory, 'feature_engineer.pkl'))
-        joblib.dump(self.classifier, os.path.join(directory, 'classifier.pkl'))
-        joblib.dump(self.regressors, os.path.join(directory, 'regressors.pkl'))
+        # Uncompressed files can be memory-mapped by load_models(). Otherwise
+        # LZ4 decompresses faster than the disk reads it saves; zlib as a
+        # fallback. load_models() detects the codec from the file header.
+        if self.fast_load:
+            compress = 0
+        else:
+            compress = ('lz4', 3) if LZ4_AVAILABLE else 3
+        for name, obj in (('preprocessor', self.preprocessor),
+                          ('feature_engineer', self.feature_engineer),
+                          ('classifier', self.classifier),
+                          ('regressors', self.regressors)):
+            joblib.dump(obj, os.path.join(directory, f'{name}.pkl'),
+                        compress=compress, protocol=pickle.HIGHEST_PROTOCOL)
         
         print(f"Models saved to {directory}/")
     
-    def load_models(self, directory='models'):
-        """Load trained models from disk."""
+    def load_models(self, directory='models', mmap_mode=None):
+        """
+        Load trained models from disk.
+        With mmap_mode='r', arrays in uncompressed model files are memory-mapped
+        instead of read into memory (compressed files are always read).
+        mmap_mode defaults to 'r' for fast_load systems.
+        """
+        if mmap_mode is None and self.fast_load:
+            mmap_mode = 'r'
         try:
-            self.preprocessor = joblib.load(os.path.join(directory, 'preprocessor.pkl'))
-            self.feature_engineer = joblib.load(os.path.join(directory, 'feature_engineer.pkl'))
-            self.classifier = joblib.load(os.path.join(directory, 'classifier.pkl'))
-            self.regressors = joblib.load(os.path.join(directory, 'regressors.pkl'))
+            with warnings.catch_warnings():
+                # XGBoost warns on every unpickle that pickles are not its stable format
+                warnings.simplefilter('ignore', UserWarning)
+                self.preprocessor = joblib.load(os.path.join(directory, 'preprocessor.pkl'), mmap_mode=mmap_mode)
+                self.feature_engineer = joblib.load(os.path.join(directory, 'feature_engineer.pkl'), mmap_mode=mmap_mode)
+                self.classifier = joblib.load(os.path.join(directory, 'classifier.pkl'), mmap_mode=mmap_mode)
+                self.regressors = joblib.load(os.path.join(directory, 'regressors.pkl'), mmap_mode=mmap_mode)
             self.is_trained = True
+            self._class_names = [str(c) for c in self.classifier.classes_]
+            self._predict_cache.clear()
             print(f"Models loaded from {directory}/")
             return True
         except FileNotFoundError:
@@ -419,7 +606,7 @@ if __name__ == "__main__":
                 print("Usage: python exoplanet_classifier.py predict <orbital_period> <transit_duration> <transit_depth> <snr> <stellar_mass> <stellar_temp> <stellar_magnitude>")
                 sys.exit(1)
             
-            system = ExoplanetClassificationSystem()
+            system = ExoplanetClassificationSystem(fast_load=True)
             system.load_models()
             
             input_features = {
@@ -441,8 +628,22 @@ if __name__ == "__main__":
                 print("\nPlanet Properties:")
                 for key, value in result['properties'].items():
                     print(f"  {key}: {value:.4f}")
+        elif sys.argv[1] == 'stream':
+            # Batch mode: CSV rows (no header, feature_cols order) on stdin,
+            # one JSON result per line on stdout; models are loaded once
+            system = ExoplanetClassificationSystem(fast_load=True)
+            with contextlib.redirect_stdout(sys.stderr):
+                loaded = system.load_models()
+            if not loaded:
+                sys.exit(1)
+            
+            for chunk in pd.read_csv(sys.stdin, header=None, names=system.feature_cols,
+                                     chunksize=STREAM_CHUNK_ROWS):
+                for result in system.predict_many(chunk):
+                    sys.stdout.write(json.dumps(result, default=float) + '\n')
+                sys.stdout.flush()
         else:
-            print("Unknown command. Use 'train' or 'predict'")
+            print("Unknown command. Use 'train', 'predict' or 'stream'")
     else:
         # Interactive mode
         interactive_terminal_interface()
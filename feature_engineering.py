@@ -3,16 +3,182 @@ Feature engineering module for exoplanet classification.
 Implements physics-based features from transit photometry.
 """
 
+import warnings
+
 import numpy as np
 import pandas as pd
 from scipy import signal
 from sklearn.base import BaseEstimator, TransformerMixin
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    print("Warning: Numba not available. Install with: pip install numba")
+
+
+# Observed input columns, in the order transform() expects for ndarray input
+INPUT_COLS = [
+    'orbital_period', 'transit_duration', 'transit_depth',
+    'snr', 'stellar_mass', 'stellar_temp', 'stellar_magnitude'
+]
+
+# Engineered columns, in the order transform() appends them after the inputs
+ENGINEERED_COLS = [
+    # Transit features
+    'duration_period_ratio', 'radius_ratio', 'estimated_impact',
+    'transit_shape', 'signal_strength',
+    # Stellar features
+    'stellar_density_proxy', 'stellar_luminosity', 'brightness_metric',
+    'stellar_radius_estimate',
+    # Orbital features
+    'semimajor_axis_estimate', 'orbital_velocity_proxy', 'insolation_flux',
+    'equilibrium_temp_estimate',
+    # Detection features
+    'mes_proxy', 'transit_probability', 'depth_noise_ratio',
+    'duration_anomaly', 'transit_shape_indicator',
+    # Statistical features
+    'period_snr_interaction', 'depth_duration_interaction',
+    'stellar_planet_interaction', 'snr_per_depth', 'period_normalized_duration'
+]
+
+
+def _engineer_features(period, duration, depth, snr, mass, temp, magnitude, out):
+    """
+    Compute all engineered features from the input column arrays into the
+    columns of out (shape (N, len(ENGINEERED_COLS))). Same formulas as the
+    calculate_*_features methods, with shared subexpressions computed once.
+    """
+    with np.errstate(all='ignore'):
+        # Transit features
+        sqrt_depth = np.sqrt(depth)
+        duration_days = duration / 24.0
+        dpr = duration_days / period
+        out[:, 0] = dpr
+        out[:, 1] = sqrt_depth
+        out[:, 2] = np.clip(1 - dpr / (2 * sqrt_depth), 0, 1)
+        depth_duration = depth * duration
+        out[:, 3] = depth_duration
+        out[:, 4] = snr * sqrt_depth
+        
+        # Stellar features (temp_ratio ** 4 as two squarings instead of pow)
+        temp_ratio = temp / 5778
+        temp_ratio4 = temp_ratio * temp_ratio
+        temp_ratio4 *= temp_ratio4
+        luminosity = mass ** 3.5
+        stellar_radius = mass ** 0.8 * np.sqrt(temp_ratio)
+        out[:, 5] = mass / temp_ratio4
+        out[:, 6] = luminosity
+        out[:, 7] = 1.0 / (10 ** (magnitude / 2.5))
+        out[:, 8] = stellar_radius
+        
+        # Orbital features
+        sma = (period / 365.25) ** (2/3) * mass ** (1/3)
+        out[:, 9] = sma
+        out[:, 10] = 1.0 / np.sqrt(sma)
+        out[:, 11] = luminosity / sma ** 2
+        out[:, 12] = temp * np.sqrt(stellar_radius / (2 * sma))
+        
+        # Detection features (MES proxy assumes 10 transits, typical for Kepler)
+        transit_probability = stellar_radius / sma
+        expected_duration = period * transit_probability * 0.1
+        out[:, 13] = snr * np.sqrt(10)
+        out[:, 14] = transit_probability
+        out[:, 15] = depth * snr
+        out[:, 16] = np.abs(duration_days - expected_duration) / expected_duration
+        out[:, 17] = dpr / sqrt_depth
+        
+        # Statistical features
+        log_period = np.log1p(period)
+        out[:, 18] = log_period * np.log1p(snr)
+        out[:, 19] = depth_duration
+        out[:, 20] = mass * sqrt_depth
+        out[:, 21] = snr / (depth + 1e-6)
+        out[:, 22] = duration / log_period
+    
+    return out
+
+
+# Below this many rows, transform() uses the compiled per-row kernel (when
+# Numba is installed); larger inputs use the vectorized NumPy path
+NUMBA_MAX_ROWS = 64
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, error_model='numpy')
+    def _engineer_rows(X, out):
+        """
+        Scalar version of _engineer_features for small inputs, where NumPy
+        call overhead dominates. X holds the INPUT_COLS columns in order.
+        """
+        for i in range(X.shape[0]):
+            period = X[i, 0]
+            duration = X[i, 1]
+            depth = X[i, 2]
+            snr = X[i, 3]
+            mass = X[i, 4]
+            temp = X[i, 5]
+            magnitude = X[i, 6]
+            
+            # Transit features
+            sqrt_depth = np.sqrt(depth)
+            duration_days = duration / 24.0
+            dpr = duration_days / period
+            impact = 1 - dpr / (2 * sqrt_depth)
+            out[i, 0] = dpr
+            out[i, 1] = sqrt_depth
+            out[i, 2] = min(max(impact, 0.0), 1.0) if impact == impact else impact
+            depth_duration = depth * duration
+            out[i, 3] = depth_duration
+            out[i, 4] = snr * sqrt_depth
+            
+            # Stellar features
+            temp_ratio = temp / 5778
+            temp_ratio2 = temp_ratio * temp_ratio
+            luminosity = mass ** 3.5
+            stellar_radius = mass ** 0.8 * np.sqrt(temp_ratio)
+            out[i, 5] = mass / (temp_ratio2 * temp_ratio2)
+            out[i, 6] = luminosity
+            out[i, 7] = 1.0 / (10 ** (magnitude / 2.5))
+            out[i, 8] = stellar_radius
+            
+            # Orbital features
+            sma = (period / 365.25) ** (2/3) * mass ** (1/3)
+            out[i, 9] = sma
+            out[i, 10] = 1.0 / np.sqrt(sma)
+            out[i, 11] = luminosity / (sma * sma)
+            out[i, 12] = temp * np.sqrt(stellar_radius / (2 * sma))
+            
+            # Detection features
+            transit_probability = stellar_radius / sma
+            expected_duration = period * transit_probability * 0.1
+            out[i, 13] = snr * np.sqrt(10.0)
+            out[i, 14] = transit_probability
+            out[i, 15] = depth * snr
+            out[i, 16] = np.abs(duration_days - expected_duration) / expected_duration
+            out[i, 17] = dpr / sqrt_depth
+            
+            # Statistical features
+            log_period = np.log1p(period)
+            out[i, 18] = log_period * np.log1p(snr)
+            out[i, 19] = depth_duration
+            out[i, 20] = mass * sqrt_depth
+            out[i, 21] = snr / (depth + 1e-6)
+            out[i, 22] = duration / log_period
+        
+        return out
+
 
 class TransitFeatureEngineering(BaseEstimator, TransformerMixin):
     """
     Feature engineering based on transit photometry and stellar characteristics.
     Inspired by techniques from Osborn et al. (2022) and NASA's EMAC.
+    
+    The calculate_*_features methods are DataFrame-level helpers that add
+    their columns to the frame they are given and return it; callers that
+    need the input unchanged pass a copy. transform() computes the same
+    features with a vectorized NumPy kernel.
     """
     
     def __init__(self):
@@ -22,7 +188,7 @@ class TransitFeatureEngineering(BaseEstimator, TransformerMixin):
         """
         Calculate physics-based features from transit parameters.
         """
-        features = df.copy()
+        features = df
         
         # Transit duration to period ratio (T/P)
         # Shorter relative durations suggest smaller planets
@@ -60,7 +226,7 @@ class TransitFeatureEngineering(BaseEstimator, TransformerMixin):
         """
         Calculate stellar characteristics relevant for planet detection.
         """
-        features = df.copy()
+        features = df
         
         # Stellar density proxy (mass/radius relationship)
         # Higher mass stars are generally larger
@@ -91,7 +257,7 @@ class TransitFeatureEngineering(BaseEstimator, TransformerMixin):
         """
         Calculate orbital characteristics from observed parameters.
         """
-        features = df.copy()
+        features = df
         
         # Semi-major axis estimate using Kepler's Third Law
         # a^3 / P^2 = G*M / (4*pi^2)
@@ -128,7 +294,7 @@ class TransitFeatureEngineering(BaseEstimator, TransformerMixin):
         """
         Calculate features related to detection reliability and quality.
         """
-        features = df.copy()
+        features = df
         
         # Multiple Event Statistic (MES) - detection significance
         # MES combines SNR with number of transits
@@ -172,7 +338,7 @@ class TransitFeatureEngineering(BaseEstimator, TransformerMixin):
         """
         Calculate statistical features for classification.
         """
-        features = df.copy()
+        features = df
         
         # Interaction terms
         features['period_snr_interaction'] = (
@@ -202,52 +368,85 @@ class TransitFeatureEngineering(BaseEstimator, TransformerMixin):
         
         return features
     
-    def fit(self, X, y=None):
-        """Fit the transformer (no-op for this transformer)."""
-        return self
-    
-    def transform(self, X):
+    def _engineer(self, X):
         """
-        Transform the input data by adding engineered features.
+        Raw engineered feature matrix (non-finite values not yet filled)
+        together with its column names and index.
         """
         # Convert to DataFrame if needed
         if isinstance(X, np.ndarray):
-            X = pd.DataFrame(X, columns=[
-                'orbital_period', 'transit_duration', 'transit_depth', 
-                'snr', 'stellar_mass', 'stellar_temp', 'stellar_magnitude'
-            ])
-        
-        # Create a copy to avoid modifying original data
-        features = X.copy()
+            X = pd.DataFrame(X, columns=INPUT_COLS)
         
-        # Apply all feature engineering steps
-        features = self.calculate_transit_features(features)
-        features = self.calculate_stellar_features(features)
-        features = self.calculate_orbital_features(features)
-        features = self.calculate_detection_features(features)
-        features = self.calculate_statistical_features(features)
+        # Input columns are kept as-is, engineered ones are appended after them
+        n_inputs = X.shape[1]
+        out = np.empty((len(X), n_inputs + len(ENGINEERED_COLS)), dtype=np.float64)
+        out[:, :n_inputs] = X.to_numpy(dtype=np.float64)
         
-        # Handle any inf or nan values
-        features = features.replace([np.inf, -np.inf], np.nan)
-        features = features.fillna(features.median())
+        input_idx = [X.columns.get_loc(col) for col in INPUT_COLS]
+        if NUMBA_AVAILABLE and len(X) < NUMBA_MAX_ROWS:
+            _engineer_rows(np.ascontiguousarray(out[:, input_idx]), out[:, n_inputs:])
+        else:
+            _engineer_features(*(out[:, j] for j in input_idx), out=out[:, n_inputs:])
         
         # Store feature names
-        self.feature_names_ = features.columns.tolist()
+        self.feature_names_ = list(X.columns) + ENGINEERED_COLS
         
-        return features
+        return out, X.index
+    
+    @staticmethod
+    def _column_medians(out):
+        """Per-column medians of the finite values (NaN for columns without any)."""
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            return np.nanmedian(np.where(np.isfinite(out), out, np.nan), axis=0)
+    
+    def _finish(self, out, index, medians):
+        """
+        Fill inf/nan cells with the given column medians and wrap in a float32
+        DataFrame. Features are computed in float64; the tree models work in
+        float32 internally, so handing them float32 halves the data they copy.
+        Without medians every row stands on its own, as if transformed alone:
+        its non-finite cells have no finite value to take, so they become NaN.
+        """
+        bad = ~np.isfinite(out)
+        if bad.any():
+            out[bad] = np.nan if medians is None else np.take(medians, np.nonzero(bad)[1])
+        
+        return pd.DataFrame(out.astype(np.float32), columns=self.feature_names_,
+                            index=index, copy=False)
+    
+    def fit(self, X, y=None):
+        """Fit the transformer: store the training medians used to impute features."""
+        out, _ = self._engineer(X)
+        self.feature_medians_ = self._column_medians(out)
+        return self
+    
+    def fit_transform(self, X, y=None, **fit_params):
+        """Fit and transform in one feature engineering pass."""
+        out, index = self._engineer(X)
+        self.feature_medians_ = self._column_medians(out)
+        return self._finish(out, index, self.feature_medians_)
+    
+    def transform(self, X):
+        """
+        Transform the input data by adding engineered features.
+        Non-finite values are replaced by the medians learned in fit() (or,
+        for transformers saved without them, set to NaN row by row, so a row's
+        features never depend on the other rows of X).
+        """
+        out, index = self._engineer(X)
+        return self._finish(out, index, getattr(self, 'feature_medians_', None))
     
     def get_feature_names_out(self, input_features=None):
         """Get output feature names."""
         return self.feature_names_ if self.feature_names_ is not None else []
 
 
-def calculate_planet_properties(orbital_period, transit_depth, stellar_mass, 
-                                stellar_temp, stellar_magnitude, transit_duration):
+def _planet_properties(orbital_period, transit_depth, stellar_mass,
+                       stellar_temp, transit_duration):
     """
-    Calculate physical planet properties from observational parameters.
-    
-    Returns:
-        dict: Planet radius, temperature, semi-major axis, impact parameter
+    Planet radius, temperature, semi-major axis and impact parameter.
+    Works element-wise on scalars or (broadcastable) arrays.
     """
     # Stellar radius estimate (solar radii)
     stellar_radius = stellar_mass ** 0.8 * (stellar_temp / 5778) ** 0.5
@@ -260,27 +459,100 @@ def calculate_planet_properties(orbital_period, transit_depth, stellar_mass,
     semi_major_axis = ((orbital_period / 365.25) ** (2/3) * 
                       stellar_mass ** (1/3))
     
-    # Stellar luminosity (solar luminosities)
-    stellar_luminosity = stellar_mass ** 3.5
+    # Planet equilibrium temperature (Kelvin), scaled to a realistic temperature
+    planet_temp = stellar_temp * np.sqrt(stellar_radius / (2 * semi_major_axis)) * (0.01 * 109.1)
     
-    # Planet equilibrium temperature (Kelvin)
-    planet_temp = stellar_temp * np.sqrt(stellar_radius / (2 * semi_major_axis))
-    planet_temp *= 0.01 * 109.1  # Convert to realistic temperature
+    # Simplified impact parameter estimate from transit duration, clipped to
+    # [0, 0.99] (undefined values map to 0.99, as with max(0, min(0.99, b)))
+    duration_ratio = (transit_duration / 24.0) / orbital_period
+    impact_parameter = 1 - (duration_ratio / (2 * radius_ratio))
+    impact_parameter = np.where(impact_parameter < 0.99, impact_parameter, 0.99)
+    impact_parameter = np.where(impact_parameter > 0, impact_parameter, 0.0)
     
-    # Impact parameter estimate
-    # From transit duration and other parameters
-    transit_duration_days = transit_duration / 24.0
-    duration_ratio = transit_duration_days / orbital_period
+    return planet_radius, planet_temp, semi_major_axis, impact_parameter
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, error_model='numpy')
+    def _planet_properties_scalar(orbital_period, transit_depth, stellar_mass,
+                                  stellar_temp, transit_duration):
+        """Compiled scalar form of _planet_properties."""
+        stellar_radius = stellar_mass ** 0.8 * (stellar_temp / 5778) ** 0.5
+        radius_ratio = np.sqrt(transit_depth)
+        planet_radius = radius_ratio * stellar_radius * 109.1
+        semi_major_axis = (orbital_period / 365.25) ** (2/3) * stellar_mass ** (1/3)
+        planet_temp = stellar_temp * np.sqrt(stellar_radius / (2 * semi_major_axis)) * (0.01 * 109.1)
+        
+        duration_ratio = (transit_duration / 24.0) / orbital_period
+        impact_parameter = 1 - (duration_ratio / (2 * radius_ratio))
+        if not impact_parameter < 0.99:
+            impact_parameter = 0.99
+        if not impact_parameter > 0:
+            impact_parameter = 0.0
+        
+        return planet_radius, planet_temp, semi_major_axis, impact_parameter
+
+
+# Inputs of these types take the vectorized path of calculate_planet_properties
+_ARRAY_TYPES = (np.ndarray, pd.Series, list, tuple)
+
+
+def calculate_planet_properties_batch(orbital_period, transit_depth, stellar_mass,
+                                      stellar_temp, stellar_magnitude, transit_duration):
+    """
+    Calculate physical planet properties for many observations at once.
+    Inputs are arrays (or array-likes / scalars broadcast against them).
     
-    # Simplified impact parameter calculation
-    impact_parameter = 1 - (duration_ratio / (2 * np.sqrt(transit_depth)))
-    impact_parameter = max(0, min(0.99, impact_parameter))
+    Returns:
+        dict: Planet radius, temperature, semi-major axis, impact parameter
+            as float64 arrays of the broadcast input shape
+    """
+    inputs = (orbital_period, transit_depth, stellar_mass, stellar_temp, transit_duration)
+    with np.errstate(all='ignore'):
+        radius, temp, sma, impact = _planet_properties(
+            *np.broadcast_arrays(*[np.asarray(value, dtype=np.float64) for value in inputs])
+        )
+    
+    return {
+        'planet_radius': radius,
+        'planet_temp': temp,
+        'semi_major_axis': sma,
+        'impact_parameter': impact
+    }
+
+
+def calculate_planet_properties(orbital_period, transit_depth, stellar_mass, 
+                                stellar_temp, stellar_magnitude, transit_duration):
+    """
+    Calculate physical planet properties from observational parameters.
+    Accepts scalars or arrays; array inputs are passed to
+    calculate_planet_properties_batch and give arrays in the result.
+    
+    Returns:
+        dict: Planet radius, temperature, semi-major axis, impact parameter
+    """
+    if (isinstance(orbital_period, _ARRAY_TYPES) or isinstance(transit_depth, _ARRAY_TYPES) or
+            isinstance(stellar_mass, _ARRAY_TYPES) or isinstance(stellar_temp, _ARRAY_TYPES) or
+            isinstance(transit_duration, _ARRAY_TYPES)):
+        return calculate_planet_properties_batch(orbital_period, transit_depth, stellar_mass,
+                                                 stellar_temp, stellar_magnitude, transit_duration)
+    
+    if NUMBA_AVAILABLE:
+        # Scalars go through the compiled kernel (returns Python floats)
+        radius, temp, sma, impact = _planet_properties_scalar(
+            float(orbital_period), float(transit_depth), float(stellar_mass),
+            float(stellar_temp), float(transit_duration)
+        )
+    else:
+        radius, temp, sma, impact = (float(value) for value in _planet_properties(
+            orbital_period, transit_depth, stellar_mass, stellar_temp, transit_duration
+        ))
     
     return {
-        'planet_radius': float(planet_radius),
-        'planet_temp': float(planet_temp),
-        'semi_major_axis': float(semi_major_axis),
-        'impact_parameter': float(impact_parameter)
+        'planet_radius': radius,
+        'planet_temp': temp,
+        'semi_major_axis': sma,
+        'impact_parameter': impact
     }
 
 
@@ -0,0 +1,34 @@
+"""
+Gunicorn configuration for the Exoplanet Classification API.
+Launch with: gunicorn app:app -c gunicorn.conf.py
+"""
+
+import gc
+import multiprocessing
+import os
+
+# Bind to the port provided by Heroku (defaults to 5000 locally)
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# Threaded workers let concurrent requests overlap sklearn's C-level
+# predict calls, which release the GIL
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', 2 * multiprocessing.cpu_count()))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# Load the model once in the master and fork it (copy-on-write) into workers
+preload_app = True
+
+timeout = 120
+
+# Keep client connections open between requests instead of reconnecting each time
+keepalive = 30
+
+
+def pre_fork(server, worker):
+    """
+    Freeze everything allocated while preloading the app (the models) into the
+    GC's permanent generation, so collections in the workers never write to
+    those pages and they stay shared instead of being copied per worker.
+    """
+    gc.freeze()
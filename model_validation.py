@@ -3,20 +3,96 @@ Model validation and evaluation against known exoplanet catalogs.
 Implements comprehensive validation metrics and uncertainty calibration.
 """
 
+import hashlib
+import os
+import sys
+
 import numpy as np
 import pandas as pd
-from sklearn.metrics import (
-    classification_report, confusion_matrix, 
-    roc_auc_score, precision_recall_curve, auc
-)
-from sklearn.model_selection import cross_val_score, StratifiedKFold
-import matplotlib.pyplot as plt
-import seaborn as sns
+import sklearn
+from joblib import Memory
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import StratifiedKFold
 import warnings
-warnings.filterwarnings('ignore')
 
 from data_preprocessing import load_nasa_exoplanet_data
 from exoplanet_classifier import ExoplanetClassificationSystem
+import ensemble_models
+from ensemble_models import ExoplanetEnsembleClassifier, XGBOOST_AVAILABLE, LIGHTGBM_AVAILABLE
+
+if XGBOOST_AVAILABLE:
+    import xgboost as xgb
+if LIGHTGBM_AVAILABLE:
+    import lightgbm as lgb
+
+# Fitted cross-validation fold classifiers are cached on disk here, so
+# re-running validation on the same data and model configuration skips
+# retraining
+FOLD_CACHE_DIR = os.path.join('.cache', 'folds')
+_fold_memory = Memory(FOLD_CACHE_DIR, verbose=0)
+
+
+# Plotting libraries are slow to import and only needed for plots, so they
+# are imported on first use
+_plotting = {}
+
+
+def _plt():
+    """matplotlib.pyplot, imported on first use."""
+    if 'plt' not in _plotting:
+        import matplotlib.pyplot as plt
+        _plotting['plt'] = plt
+    return _plotting['plt']
+
+
+def _sns():
+    """seaborn, imported on first use."""
+    if 'sns' not in _plotting:
+        import seaborn as sns
+        _plotting['sns'] = sns
+    return _plotting['sns']
+
+
+def _model_config():
+    """
+    Everything besides the data that determines a fitted fold, used as part
+    of the fold cache key: the model library versions, a hash of the
+    ensemble_models source (which defines how the ensemble is fitted) and
+    the hyperparameters of the unfitted ensemble members.
+    """
+    with open(ensemble_models.__file__, 'rb') as f:
+        source_hash = hashlib.sha256(f.read()).hexdigest()
+    members = ExoplanetEnsembleClassifier(use_advanced_models=True).models
+    return {
+        'versions': (
+            sklearn.__version__,
+            xgb.__version__ if XGBOOST_AVAILABLE else None,
+            lgb.__version__ if LIGHTGBM_AVAILABLE else None
+        ),
+        'ensemble_models': source_hash,
+        'params': {name: repr(model.get_params()) for name, model in members.items()}
+    }
+
+
+@_fold_memory.cache
+def _fit_fold(X_train, y_train, config):
+    """Train the classifier for one cross-validation fold (cached on the data and model config)."""
+    fold_classifier = ExoplanetEnsembleClassifier(use_advanced_models=True)
+    fold_classifier.fit(X_train, y_train)
+    return fold_classifier
+
+
+def _class_mask(labels, cls):
+    """
+    Boolean mask of the rows labelled ``cls``. Categorical labels are
+    compared by their integer codes instead of string by string.
+    """
+    if isinstance(labels, pd.Series) and isinstance(labels.dtype, pd.CategoricalDtype):
+        categories = labels.cat.categories
+        if cls not in categories:
+            return np.zeros(len(labels), dtype=bool)
+        return labels.cat.codes.to_numpy() == categories.get_loc(cls)
+    return np.asarray(labels) == cls
 
 
 class ModelValidator:
@@ -24,43 +100,54 @@ class ModelValidator:
     Comprehensive validation for exoplanet classification models.
     """
     
-    def __init__(self, system):
+    def __init__(self, system, verbose=True):
         self.system = system
+        self.verbose = verbose
         self.validation_results = {}
     
-    def cross_validate(self, X, y, cv=5):
+    def _print(self, *args):
+        """Print report output unless the validator is quiet."""
+        if self.verbose:
+            print(*args)
+    
+    def cross_validate(self, X, y, cv=5, use_cache=True):
         """
         Perform cross-validation on the classifier.
+        Fitted folds are reused from FOLD_CACHE_DIR unless use_cache is False,
+        which retrains every fold (and leaves the cache untouched).
         """
-        print("\n" + "="*70)
-        print("CROSS-VALIDATION")
-        print("="*70)
+        self._print("\n" + "="*70)
+        self._print("CROSS-VALIDATION")
+        self._print("="*70)
         
+        # Slice folds from contiguous arrays rather than DataFrames
+        X_arr = np.ascontiguousarray(np.asarray(X))
+        y_arr = np.asarray(y)
         skf = StratifiedKFold(n_splits=cv, shuffle=True, random_state=42)
+        folds = list(skf.split(X_arr, y_arr))
         
+        config = _model_config()
+        fit_fold = _fit_fold if use_cache else _fit_fold.func
         scores = []
-        for fold, (train_idx, val_idx) in enumerate(skf.split(X, y), 1):
-            X_train, X_val = X.iloc[train_idx], X.iloc[val_idx]
-            y_train, y_val = y.iloc[train_idx], y.iloc[val_idx]
+        for fold, (train_idx, val_idx) in enumerate(folds, 1):
+            X_train, X_val = X_arr[train_idx], X_arr[val_idx]
+            y_train, y_val = y_arr[train_idx], y_arr[val_idx]
             
-            # Train fold
-            from ensemble_models import ExoplanetEnsembleClassifier
-            fold_classifier = ExoplanetEnsembleClassifier(use_advanced_models=True)
-            fold_classifier.fit(X_train, y_train)
+            # Train fold (served from the fold cache for data and config seen before)
+            fold_classifier = fit_fold(X_train, y_train, config)
             
             # Evaluate
             y_pred = fold_classifier.predict(X_val)
-            from sklearn.metrics import accuracy_score
             score = accuracy_score(y_val, y_pred)
             scores.append(score)
             
-            print(f"Fold {fold}: Accuracy = {score:.4f}")
+            self._print(f"Fold {fold}: Accuracy = {score:.4f}")
         
         mean_score = np.mean(scores)
         std_score = np.std(scores)
         
-        print(f"\nCross-validation Results:")
-        print(f"  Mean Accuracy: {mean_score:.4f} ± {std_score:.4f}")
+        self._print(f"\nCross-validation Results:")
+        self._print(f"  Mean Accuracy: {mean_score:.4f} ± {std_score:.4f}")
         
         self.validation_results['cv_scores'] = scores
         self.validation_results['cv_mean'] = mean_score
@@ -72,45 +159,48 @@ class ModelValidator:
         """
         Analyze calibration of confidence scores.
         """
-        print("\n" + "="*70)
-        print("CALIBRATION ANALYSIS")
-        print("="*70)
+        self._print("\n" + "="*70)
+        self._print("CALIBRATION ANALYSIS")
+        self._print("="*70)
         
         # Get predictions with confidence
         results = self.system.classifier.predict_with_uncertainty(X)
         predictions = results['predictions']
         confidence = results['confidence']
         
-        # Bin predictions by confidence
+        # Bin predictions by confidence (bins 1-10; a confidence of exactly
+        # 1.0 falls past the last bin and is left out)
         bins = np.linspace(0, 1, 11)
         bin_indices = np.digitize(confidence, bins)
-        
-        calibration_data = []
-        for i in range(1, len(bins)):
-            mask = bin_indices == i
-            if np.sum(mask) > 0:
-                bin_confidence = np.mean(confidence[mask])
-                bin_accuracy = np.mean(predictions[mask] == y[mask])
-                bin_count = np.sum(mask)
-                
-                calibration_data.append({
-                    'confidence': bin_confidence,
-                    'accuracy': bin_accuracy,
-                    'count': bin_count
-                })
-        
-        calibration_df = pd.DataFrame(calibration_data)
-        
-        print("\nCalibration Table:")
-        print(calibration_df.to_string(index=False))
+        correct = (predictions == np.asarray(y)).astype(np.float64)
+        
+        # Per-bin counts and sums in one pass each
+        n_bins = len(bins) + 1
+        counts = np.bincount(bin_indices, minlength=n_bins)[1:len(bins)]
+        conf_sums = np.bincount(bin_indices, weights=confidence, minlength=n_bins)[1:len(bins)]
+        acc_sums = np.bincount(bin_indices, weights=correct, minlength=n_bins)[1:len(bins)]
+        
+        nonempty = counts > 0
+        counts = counts[nonempty]
+        calibration_df = pd.DataFrame({
+            'confidence': conf_sums[nonempty] / counts,
+            'accuracy': acc_sums[nonempty] / counts,
+            'count': counts
+        })
+        
+        if self.verbose:
+            print("\nCalibration Table:")
+            sys.stdout.write(" confidence  accuracy  count\n")
+            for row in calibration_df.itertuples(index=False):
+                sys.stdout.write(f"{row.confidence:11.6f} {row.accuracy:9.6f} {row.count:6d}\n")
         
         # Calculate Expected Calibration Error (ECE)
         ece = np.sum(
-            np.abs(calibration_df['accuracy'] - calibration_df['confidence']) * 
-            calibration_df['count']
-        ) / np.sum(calibration_df['count'])
+            np.abs(calibration_df['accuracy'].to_numpy() - calibration_df['confidence'].to_numpy()) *
+            counts
+        ) / counts.sum()
         
-        print(f"\nExpected Calibration Error (ECE): {ece:.4f}")
+        self._print(f"\nExpected Calibration Error (ECE): {ece:.4f}")
         
         self.validation_results['calibration'] = calibration_df
         self.validation_results['ece'] = ece
@@ -121,30 +211,30 @@ class ModelValidator:
         """
         Analyze classification errors in detail.
         """
-        print("\n" + "="*70)
-        print("ERROR ANALYSIS")
-        print("="*70)
+        self._print("\n" + "="*70)
+        self._print("ERROR ANALYSIS")
+        self._print("="*70)
         
         # Get predictions
         predictions = self.system.classifier.predict(X)
         
         # Find errors
-        errors = predictions != y
-        error_indices = np.where(errors)[0]
+        y_arr = np.asarray(y)
+        errors = predictions != y_arr
         
-        print(f"\nTotal errors: {np.sum(errors)} / {len(y)} ({np.mean(errors):.2%})")
+        self._print(f"\nTotal errors: {np.sum(errors)} / {len(y)} ({np.mean(errors):.2%})")
         
-        # Analyze error types
-        error_types = {}
-        for idx in error_indices:
-            true_class = y.iloc[idx]
-            pred_class = predictions[idx]
-            error_type = f"{true_class} -> {pred_class}"
-            error_types[error_type] = error_types.get(error_type, 0) + 1
+        # Analyze error types (counted per true/predicted pair, in order of first occurrence)
+        error_df = pd.DataFrame({'true': y_arr[errors], 'pred': predictions[errors]})
+        error_counts = error_df.groupby(['true', 'pred'], sort=False).size()
+        error_types = {
+            f"{true_class} -> {pred_class}": int(count)
+            for (true_class, pred_class), count in error_counts.items()
+        }
         
-        print("\nError Types:")
+        self._print("\nError Types:")
         for error_type, count in sorted(error_types.items(), key=lambda x: x[1], reverse=True):
-            print(f"  {error_type}: {count}")
+            self._print(f"  {error_type}: {count}")
         
         self.validation_results['error_rate'] = np.mean(errors)
         self.validation_results['error_types'] = error_types
@@ -155,9 +245,9 @@ class ModelValidator:
         """
         Evaluate quality of uncertainty estimates.
         """
-        print("\n" + "="*70)
-        print("UNCERTAINTY QUALITY ASSESSMENT")
-        print("="*70)
+        self._print("\n" + "="*70)
+        self._print("UNCERTAINTY QUALITY ASSESSMENT")
+        self._print("="*70)
         
         # Get predictions with uncertainty
         results = self.system.classifier.predict_with_uncertainty(X)
@@ -166,20 +256,25 @@ class ModelValidator:
         confidence = results['confidence']
         
         # Analyze relationship between uncertainty and correctness
-        correct = predictions == y
+        correct = predictions == np.asarray(y)
         
-        print("\nUncertainty Statistics:")
-        print(f"  Correct predictions - Mean uncertainty: {np.mean(uncertainty[correct]):.4f}")
-        print(f"  Incorrect predictions - Mean uncertainty: {np.mean(uncertainty[~correct]):.4f}")
+        self._print("\nUncertainty Statistics:")
+        self._print(f"  Correct predictions - Mean uncertainty: {np.mean(uncertainty[correct]):.4f}")
+        self._print(f"  Incorrect predictions - Mean uncertainty: {np.mean(uncertainty[~correct]):.4f}")
         
-        print(f"\nConfidence Statistics:")
-        print(f"  Correct predictions - Mean confidence: {np.mean(confidence[correct]):.4f}")
-        print(f"  Incorrect predictions - Mean confidence: {np.mean(confidence[~correct]):.4f}")
+        self._print(f"\nConfidence Statistics:")
+        self._print(f"  Correct predictions - Mean confidence: {np.mean(confidence[correct]):.4f}")
+        self._print(f"  Incorrect predictions - Mean confidence: {np.mean(confidence[~correct]):.4f}")
         
         # Uncertainty-accuracy correlation
-        correlation = np.corrcoef(uncertainty, ~correct)[0, 1]
-        print(f"\nUncertainty-Error Correlation: {correlation:.4f}")
-        print("(Higher correlation means uncertainty is more informative)")
+        # (Pearson, closed form; 0 when either variable is constant)
+        u = uncertainty - uncertainty.mean()
+        e = ~correct
+        e = e - e.mean()
+        den = np.sqrt(np.dot(u, u) * np.dot(e, e))
+        correlation = np.dot(u, e) / den if den > 0 else 0.0
+        self._print(f"\nUncertainty-Error Correlation: {correlation:.4f}")
+        self._print("(Higher correlation means uncertainty is more informative)")
         
         self.validation_results['uncertainty_stats'] = {
             'correct_uncertainty': np.mean(uncertainty[correct]),
@@ -193,59 +288,66 @@ class ModelValidator:
         """
         Validate planet property predictions.
         """
-        print("\n" + "="*70)
-        print("PROPERTY PREDICTION VALIDATION")
-        print("="*70)
+        self._print("\n" + "="*70)
+        self._print("PROPERTY PREDICTION VALIDATION")
+        self._print("="*70)
         
         # Filter to confirmed exoplanets
-        confirmed_mask = classification == 'confirmed_exoplanet'
+        confirmed_mask = _class_mask(classification, 'confirmed_exoplanet')
         X_confirmed = X[confirmed_mask]
         
         if len(X_confirmed) == 0:
-            print("No confirmed exoplanets in dataset")
+            self._print("No confirmed exoplanets in dataset")
             return
         
         # Get predictions
         props_pred, props_uncert = self.system.regressors.predict_with_uncertainty(X_confirmed)
         
-        # Calculate metrics for each property
-        property_metrics = {}
-        
-        for prop_name in ['planet_radius', 'planet_temp', 'semi_major_axis', 'impact_parameter']:
-            y_true = y_properties[prop_name][confirmed_mask]
-            valid = ~np.isnan(y_true)
-            
-            if not np.any(valid):
-                continue
-            
-            y_pred = props_pred[prop_name][valid]
-            y_true_valid = y_true[valid]
-            uncert = props_uncert[prop_name][valid]
+        # Calculate metrics for all properties at once on (N, 4) arrays,
+        # over the rows where the true value is known
+        prop_names = ['planet_radius', 'planet_temp', 'semi_major_axis', 'impact_parameter']
+        Y_true = np.column_stack([y_properties[p][confirmed_mask] for p in prop_names])
+        Y_pred = np.column_stack([props_pred[p] for p in prop_names])
+        U = np.column_stack([props_uncert[p] for p in prop_names])
+        
+        valid = ~np.isnan(Y_true)
+        count = valid.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            Y_true = np.where(valid, Y_true, 0.0)
+            diff = np.where(valid, Y_pred - Y_true, 0.0)
+            sq_err = diff ** 2
             
-            # Calculate metrics
-            mae = np.mean(np.abs(y_pred - y_true_valid))
-            rmse = np.sqrt(np.mean((y_pred - y_true_valid) ** 2))
-            mape = np.mean(np.abs((y_pred - y_true_valid) / (y_true_valid + 1e-10))) * 100
+            mae = np.abs(diff).sum(axis=0) / count
+            rmse = np.sqrt(sq_err.sum(axis=0) / count)
+            mape = np.abs(diff / (Y_true + 1e-10)).sum(axis=0) / count * 100
             
             # R-squared
-            ss_res = np.sum((y_true_valid - y_pred) ** 2)
-            ss_tot = np.sum((y_true_valid - np.mean(y_true_valid)) ** 2)
+            ss_res = sq_err.sum(axis=0)
+            deviation = np.where(valid, Y_true - Y_true.sum(axis=0) / count, 0.0)
+            ss_tot = (deviation ** 2).sum(axis=0)
             r2 = 1 - (ss_res / ss_tot)
             
+            mean_uncertainty = np.where(valid, U, 0.0).sum(axis=0) / count
+        
+        property_metrics = {}
+        for j, prop_name in enumerate(prop_names):
+            if count[j] == 0:
+                continue
+            
             property_metrics[prop_name] = {
-                'mae': mae,
-                'rmse': rmse,
-                'mape': mape,
-                'r2': r2,
-                'mean_uncertainty': np.mean(uncert)
+                'mae': mae[j],
+                'rmse': rmse[j],
+                'mape': mape[j],
+                'r2': r2[j],
+                'mean_uncertainty': mean_uncertainty[j]
             }
             
-            print(f"\n{prop_name}:")
-            print(f"  MAE: {mae:.4f}")
-            print(f"  RMSE: {rmse:.4f}")
-            print(f"  MAPE: {mape:.2f}%")
-            print(f"  R²: {r2:.4f}")
-            print(f"  Mean Uncertainty: {np.mean(uncert):.4f}")
+            self._print(f"\n{prop_name}:")
+            self._print(f"  MAE: {mae[j]:.4f}")
+            self._print(f"  RMSE: {rmse[j]:.4f}")
+            self._print(f"  MAPE: {mape[j]:.2f}%")
+            self._print(f"  R²: {r2[j]:.4f}")
+            self._print(f"  Mean Uncertainty: {mean_uncertainty[j]:.4f}")
         
         self.validation_results['property_metrics'] = property_metrics
         
@@ -255,9 +357,9 @@ class ModelValidator:
         """
         Generate comprehensive validation report.
         """
-        print("\n" + "="*70)
-        print("COMPREHENSIVE MODEL VALIDATION REPORT")
-        print("="*70)
+        self._print("\n" + "="*70)
+        self._print("COMPREHENSIVE MODEL VALIDATION REPORT")
+        self._print("="*70)
         
         # Cross-validation
         self.cross_validate(X, y, cv=5)
@@ -276,13 +378,13 @@ class ModelValidator:
             self.property_prediction_validation(X, y_properties, y)
         
         # Summary
-        print("\n" + "="*70)
-        print("VALIDATION SUMMARY")
-        print("="*70)
-        print(f"\nCross-validation Accuracy: {self.validation_results['cv_mean']:.4f} ± {self.validation_results['cv_std']:.4f}")
-        print(f"Expected Calibration Error: {self.validation_results['ece']:.4f}")
-        print(f"Error Rate: {self.validation_results['error_rate']:.2%}")
-        print(f"Uncertainty-Error Correlation: {self.validation_results['uncertainty_stats']['correlation']:.4f}")
+        self._print("\n" + "="*70)
+        self._print("VALIDATION SUMMARY")
+        self._print("="*70)
+        self._print(f"\nCross-validation Accuracy: {self.validation_results['cv_mean']:.4f} ± {self.validation_results['cv_std']:.4f}")
+        self._print(f"Expected Calibration Error: {self.validation_results['ece']:.4f}")
+        self._print(f"Error Rate: {self.validation_results['error_rate']:.2%}")
+        self._print(f"Uncertainty-Error Correlation: {self.validation_results['uncertainty_stats']['correlation']:.4f}")
         
         return self.validation_results
 
@@ -291,41 +393,45 @@ def validate_system():
     """
     Main validation function.
     """
-    print("Loading exoplanet data for validation...")
-    df = load_nasa_exoplanet_data()
-    
-    print("Initializing classification system...")
-    system = ExoplanetClassificationSystem()
-    
-    # Check if models are trained
-    if not system.load_models():
-        print("Training models...")
-        system.train(df, save_models=True)
-    
-    # Prepare data
-    feature_cols = [
-        'orbital_period', 'transit_duration', 'transit_depth', 
-        'snr', 'stellar_mass', 'stellar_temp', 'stellar_magnitude'
-    ]
-    
-    X = df[feature_cols]
-    y = df['classification']
-    
-    y_properties = {
-        'planet_radius': df['planet_radius'].values,
-        'planet_temp': df['planet_temp'].values,
-        'semi_major_axis': df['semi_major_axis'].values,
-        'impact_parameter': df['impact_parameter'].values
-    }
-    
-    # Feature engineering
-    X_engineered = system.feature_engineer.transform(X)
-    
-    # Validation
-    validator = ModelValidator(system)
-    results = validator.full_validation_report(X_engineered, y, y_properties)
-    
-    return results
+    # Keep validation output readable (library warnings are not shown)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        
+        print("Loading exoplanet data for validation...")
+        df = load_nasa_exoplanet_data()
+        
+        print("Initializing classification system...")
+        system = ExoplanetClassificationSystem()
+        
+        # Check if models are trained
+        if not system.load_models():
+            print("Training models...")
+            system.train(df, save_models=True)
+        
+        # Prepare data
+        feature_cols = [
+            'orbital_period', 'transit_duration', 'transit_depth', 
+            'snr', 'stellar_mass', 'stellar_temp', 'stellar_magnitude'
+        ]
+        
+        X = df[feature_cols]
+        y = df['classification'].astype('category')
+        
+        y_properties = {
+            'planet_radius': df['planet_radius'].values,
+            'planet_temp': df['planet_temp'].values,
+            'semi_major_axis': df['semi_major_axis'].values,
+            'impact_parameter': df['impact_parameter'].values
+        }
+        
+        # Feature engineering
+        X_engineered = system.feature_engineer.transform(X)
+        
+        # Validation
+        validator = ModelValidator(system)
+        results = validator.full_validation_report(X_engineered, y, y_properties)
+        
+        return results
 
 
 if __name__ == "__main__":
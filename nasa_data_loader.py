@@ -2,49 +2,161 @@
 Load real confirmed exoplanet data from NASA Exoplanet Archive.
 """
 
+import os
+import time
 import pandas as pd
 import numpy as np
 import requests
-from io import StringIO
 
+from real_exoplanet_data import CLASSIFICATION_DTYPE, DATASET_SEED, combine_shuffled
 
-def download_nasa_confirmed_exoplanets():
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    import numexpr as ne
+    NUMEXPR_AVAILABLE = True
+except ImportError:
+    NUMEXPR_AVAILABLE = False
+
+try:
+    from astroquery.ipac.nexsci.nasa_exoplanet_archive import NasaExoplanetArchive
+    ASTROQUERY_AVAILABLE = True
+except ImportError:
+    ASTROQUERY_AVAILABLE = False
+
+
+# Numeric columns returned by the TAP query, parsed straight to float64
+NASA_FLOAT_COLUMNS = [
+    'orbital_period', 'transit_duration', 'transit_depth', 'planet_radius_ratio',
+    'planet_radius', 'semi_major_axis', 'planet_temp', 'impact_parameter',
+    'stellar_mass', 'stellar_temp', 'stellar_magnitude', 'sy_snum', 'sy_pnum'
+]
+
+# Parsed archive download, reused until it is older than NASA_CACHE_MAX_AGE
+# seconds (Parquet when pyarrow is available, pickle otherwise)
+NASA_CACHE_PATH = os.path.join('.cache', 'nasa_ps.parquet' if PYARROW_AVAILABLE else 'nasa_ps.pkl')
+NASA_CACHE_MAX_AGE = 7 * 24 * 3600
+
+# Confirmed transiting exoplanets, shared by the astroquery and raw TAP paths
+NASA_TAP_SELECT = """
+    pl_name,
+    pl_orbper as orbital_period,
+    pl_trandur as transit_duration,
+    pl_trandep as transit_depth,
+    pl_ratror as planet_radius_ratio,
+    pl_rade as planet_radius,
+    pl_orbsmax as semi_major_axis,
+    pl_eqt as planet_temp,
+    pl_imppar as impact_parameter,
+    st_mass as stellar_mass,
+    st_teff as stellar_temp,
+    st_optmag as stellar_magnitude,
+    sy_snum,
+    sy_pnum
+"""
+
+NASA_TAP_WHERE = """
+    pl_orbper IS NOT NULL
+    AND pl_trandur IS NOT NULL
+    AND pl_trandep IS NOT NULL
+    AND st_mass IS NOT NULL
+    AND st_teff IS NOT NULL
+    AND pl_rade IS NOT NULL
+    AND default_flag = 1
+"""
+
+
+def _read_tap_csv(stream):
+    """
+    Parse a streamed TAP CSV response into a DataFrame.
+    """
+    if PYARROW_AVAILABLE:
+        table = pa_csv.read_csv(
+            stream,
+            read_options=pa_csv.ReadOptions(block_size=1 << 20),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={col: pa.float64() for col in NASA_FLOAT_COLUMNS}
+            )
+        )
+        return table.to_pandas()
+    return pd.read_csv(stream)
+
+
+def _query_astroquery():
+    """
+    Run the archive query through astroquery, which transfers a typed
+    VOTable instead of CSV text.
+    """
+    table = NasaExoplanetArchive.query_criteria(
+        table='ps', select=' '.join(NASA_TAP_SELECT.split()),
+        where=' '.join(NASA_TAP_WHERE.split())
+    )
+    df = table.to_pandas()
+    float_cols = [col for col in NASA_FLOAT_COLUMNS if col in df.columns]
+    df[float_cols] = df[float_cols].astype(np.float64)
+    return df
+
+
+def download_nasa_confirmed_exoplanets(force_refresh=False):
     """
     Download confirmed exoplanet data from NASA Exoplanet Archive.
+    A fresh on-disk copy of a previous download is returned instead unless
+    force_refresh is set.
+    """
+    if not force_refresh and os.path.exists(NASA_CACHE_PATH):
+        if time.time() - os.path.getmtime(NASA_CACHE_PATH) < NASA_CACHE_MAX_AGE:
+            try:
+                if PYARROW_AVAILABLE:
+                    df = pd.read_parquet(NASA_CACHE_PATH)
+                else:
+                    df = pd.read_pickle(NASA_CACHE_PATH)
+                print(f"✓ Loaded {len(df)} confirmed exoplanets from cache ({NASA_CACHE_PATH})")
+                return df
+            except Exception as e:
+                print(f"Could not read cached NASA data: {e}")
+    
+    df = _download_nasa_confirmed_exoplanets()
+    if df is not None:
+        try:
+            os.makedirs(os.path.dirname(NASA_CACHE_PATH), exist_ok=True)
+            if PYARROW_AVAILABLE:
+                df.to_parquet(NASA_CACHE_PATH, compression='zstd')
+            else:
+                df.to_pickle(NASA_CACHE_PATH)
+        except Exception as e:
+            print(f"Could not cache NASA data: {e}")
+    return df
+
+
+def _download_nasa_confirmed_exoplanets():
+    """
+    Fetch the archive table over the network, bypassing the cache.
     """
     print("Downloading confirmed exoplanet data from NASA Exoplanet Archive...")
     
+    if ASTROQUERY_AVAILABLE:
+        try:
+            df = _query_astroquery()
+            print(f"✓ Downloaded {len(df)} confirmed exoplanets from NASA")
+            return df
+        except Exception as e:
+            print(f"astroquery download failed ({e}), falling back to TAP CSV")
+    
     # NASA Exoplanet Archive TAP service
     # Get confirmed exoplanets with transit data
     base_url = "https://exoplanetarchive.ipac.caltech.edu/TAP/sync"
-    
-    # Query for confirmed transiting exoplanets
-    query = """
-    SELECT 
-        pl_name,
-        pl_orbper as orbital_period,
-        pl_trandur as transit_duration,
-        pl_trandep as transit_depth,
-        pl_ratror as planet_radius_ratio,
-        pl_rade as planet_radius,
-        pl_orbsmax as semi_major_axis,
-        pl_eqt as planet_temp,
-        pl_imppar as impact_parameter,
-        st_mass as stellar_mass,
-        st_teff as stellar_temp,
-        st_optmag as stellar_magnitude,
-        sy_snum,
-        sy_pnum
-    FROM ps 
-    WHERE 
-        pl_orbper IS NOT NULL 
-        AND pl_trandur IS NOT NULL
-        AND pl_trandep IS NOT NULL
-        AND st_mass IS NOT NULL
-        AND st_teff IS NOT NULL
-        AND pl_rade IS NOT NULL
-        AND default_flag = 1
-    """
+    query = f"SELECT {NASA_TAP_SELECT} FROM ps WHERE {NASA_TAP_WHERE}"
     
     params = {
         'request': 'doQuery',
@@ -54,33 +166,40 @@ def download_nasa_confirmed_exoplanets():
     }
     
     try:
-        response = requests.get(base_url, params=params, timeout=30)
-        
-        if response.status_code == 200:
-            df = pd.read_csv(StringIO(response.text))
-            print(f"✓ Downloaded {len(df)} confirmed exoplanets from NASA")
-            return df
-        else:
-            print(f"Failed to download: Status {response.status_code}")
-            return None
+        # Stream the body straight into the CSV parser instead of decoding
+        # the whole payload into a str first
+        with requests.get(base_url, params=params, stream=True, timeout=30) as response:
+            if response.status_code == 200:
+                response.raw.decode_content = True
+                df = _read_tap_csv(response.raw)
+                print(f"✓ Downloaded {len(df)} confirmed exoplanets from NASA")
+                return df
+            else:
+                print(f"Failed to download: Status {response.status_code}")
+                return None
     except Exception as e:
         print(f"Error downloading NASA data: {e}")
         return None
 
 
-def create_training_dataset_from_nasa(nasa_df, n_target=100):
+def create_training_dataset_from_nasa(nasa_df, n_target=100, rng=None):
     """
     Create training dataset from NASA confirmed exoplanets.
+    The SNR noise is drawn from rng (seeded with DATASET_SEED if not given).
     """
+    if rng is None:
+        rng = np.random.default_rng(DATASET_SEED)
     print(f"\nProcessing NASA data for training...")
     
-    # Clean the NASA data
-    df_clean = nasa_df.copy()
-    
-    # Remove any remaining NaNs in critical columns
+    # Clean the NASA data: remove any remaining NaNs in critical columns.
+    # The TAP query already filters them out server-side, so usually only a
+    # shallow copy is needed (either way the caller's frame is never modified)
     required_cols = ['orbital_period', 'transit_duration', 'transit_depth', 
                      'stellar_mass', 'stellar_temp']
-    df_clean = df_clean.dropna(subset=required_cols)
+    if nasa_df[required_cols].isna().to_numpy().any():
+        df_clean = nasa_df.dropna(subset=required_cols)
+    else:
+        df_clean = nasa_df.copy(deep=False)
     
     # Convert transit depth to decimal if needed (some are in %)
     if df_clean['transit_depth'].max() > 1:
@@ -92,24 +211,24 @@ def create_training_dataset_from_nasa(nasa_df, n_target=100):
     
     # Estimate SNR based on transit depth and other factors
     # Higher SNR for: brighter stars, deeper transits, well-studied systems
-    base_snr = 15
-    depth_factor = np.sqrt(df_clean['transit_depth'] * 1000)  # Deeper = easier to detect
-    
-    # Magnitude effect (brighter = higher SNR)
-    mag_factor = np.where(
-        df_clean['stellar_magnitude'].notna(),
-        np.exp(-(df_clean['stellar_magnitude'] - 10) / 5),
-        1.0
-    )
-    
-    # Period effect (longer period = fewer transits = lower SNR)
-    period_factor = 1.0 / (1 + df_clean['orbital_period'] / 50)
-    
-    df_clean['snr'] = base_snr * depth_factor * mag_factor * period_factor
-    df_clean['snr'] = df_clean['snr'].clip(5, 50)  # Reasonable SNR range
-    
-    # Add some realistic noise
-    df_clean['snr'] = df_clean['snr'] * np.random.uniform(0.8, 1.2, len(df_clean))
+    # - depth: deeper = easier to detect
+    # - magnitude: brighter = higher SNR (no effect when unknown)
+    # - period: longer period = fewer transits = lower SNR
+    # Clipped to a reasonable SNR range, then given some realistic noise
+    depth = df_clean['transit_depth'].to_numpy(dtype=np.float64)
+    mag = df_clean['stellar_magnitude'].to_numpy(dtype=np.float64)
+    period = df_clean['orbital_period'].to_numpy(dtype=np.float64)
+    noise = rng.uniform(0.8, 1.2, len(df_clean))
+    
+    if NUMEXPR_AVAILABLE:
+        # Fused passes with no per-factor temporaries
+        snr = ne.evaluate('15 * sqrt(depth * 1000) * where(mag != mag, 1.0, exp(-(mag - 10) / 5))'
+                          ' / (1 + period / 50)')
+        ne.evaluate('where(snr < 5, 5.0, where(snr > 50, 50.0, snr)) * noise', out=snr)
+    else:
+        mag_factor = np.where(np.isnan(mag), 1.0, np.exp(-(mag - 10) / 5))
+        snr = np.clip(15 * np.sqrt(depth * 1000) * mag_factor / (1 + period / 50), 5, 50) * noise
+    df_clean['snr'] = snr
     
     # Handle missing stellar magnitude
     df_clean['stellar_magnitude'] = df_clean['stellar_magnitude'].fillna(14.0)
@@ -119,9 +238,9 @@ def create_training_dataset_from_nasa(nasa_df, n_target=100):
         # Prioritize diverse period range
         df_clean = df_clean.sort_values('orbital_period')
         indices = np.linspace(0, len(df_clean)-1, n_target, dtype=int)
-        df_confirmed = df_clean.iloc[indices].copy()
+        df_confirmed = df_clean.take(indices)
     else:
-        df_confirmed = df_clean.copy()
+        df_confirmed = df_clean
     
     # Add classification label
     df_confirmed['classification'] = 'confirmed_exoplanet'
@@ -133,121 +252,118 @@ def create_training_dataset_from_nasa(nasa_df, n_target=100):
     return df_confirmed
 
 
-def create_false_positives(n_samples=50):
+def create_false_positives(n_samples=50, rng=None):
     """
-    Create realistic false positive examples.
+    Create realistic false positive examples, drawn from rng (seeded with
+    42 if not given).
     """
     print(f"\nGenerating {n_samples} false positive examples...")
     
-    np.random.seed(42)
-    data = []
-    
-    for i in range(n_samples):
-        fp_type = np.random.choice(['eclipsing_binary', 'background', 'artifact'], 
-                                   p=[0.7, 0.2, 0.1])
-        
-        if fp_type == 'eclipsing_binary':
-            # Eclipsing binary stars - MUCH deeper transits
-            orbital_period = np.random.lognormal(0.5, 1.5)  # Short periods
-            transit_depth = np.random.uniform(0.05, 0.30)  # 5-30% depth!
-            transit_duration = np.random.normal(4, 1.5)
-            snr = np.random.lognormal(2.5, 0.5)
-            stellar_mass = np.random.normal(1.0, 0.5)
-            stellar_temp = np.random.normal(5500, 1000)
-            stellar_magnitude = np.random.normal(14, 2)
-            
-        elif fp_type == 'background':
-            # Background eclipsing binary
-            orbital_period = np.random.lognormal(1.5, 2.0)
-            transit_depth = np.random.lognormal(-6, 1.0)  # Very shallow
-            transit_duration = np.random.normal(3, 2)
-            snr = np.random.lognormal(1.0, 1.0)  # Low SNR
-            stellar_mass = np.random.normal(1.0, 0.5)
-            stellar_temp = np.random.normal(5500, 1200)
-            stellar_magnitude = np.random.normal(16, 2)
-            
-        else:  # artifact
-            orbital_period = np.random.uniform(0.5, 50)
-            transit_depth = np.random.lognormal(-6, 2.0)
-            transit_duration = np.random.uniform(0.5, 8)
-            snr = np.random.lognormal(0.5, 1.5)
-            stellar_mass = np.random.normal(1.0, 0.5)
-            stellar_temp = np.random.normal(5500, 1500)
-            stellar_magnitude = np.random.normal(16, 3)
-        
-        data.append({
-            'orbital_period': max(0.5, orbital_period),
-            'transit_duration': max(0.5, transit_duration),
-            'transit_depth': max(0.0001, min(0.5, transit_depth)),
-            'snr': max(3, snr),
-            'stellar_mass': max(0.1, stellar_mass),
-            'stellar_temp': max(3000, min(10000, stellar_temp)),
-            'stellar_magnitude': max(8, min(20, stellar_magnitude)),
-            'classification': 'false_positive',
-            'planet_radius': np.nan,
-            'planet_temp': np.nan,
-            'semi_major_axis': np.nan,
-            'impact_parameter': np.nan
-        })
-    
-    return pd.DataFrame(data)
-
-
-def create_candidates(n_samples=30):
+    if rng is None:
+        rng = np.random.default_rng(42)
+    n = n_samples
+    fp_type = rng.choice(3, size=n, p=[0.7, 0.2, 0.1])  # eclipsing_binary, background, artifact
+    
+    # Eclipsing binary stars - MUCH deeper transits (5-30% depth!), short periods
+    # Background eclipsing binary - very shallow, low SNR
+    # Artifact - random periods, anything goes
+    orbital_period = np.choose(fp_type, [rng.lognormal(0.5, 1.5, n),
+                                         rng.lognormal(1.5, 2.0, n),
+                                         rng.uniform(0.5, 50, n)])
+    transit_depth = np.choose(fp_type, [rng.uniform(0.05, 0.30, n),
+                                        rng.lognormal(-6, 1.0, n),
+                                        rng.lognormal(-6, 2.0, n)])
+    transit_duration = np.choose(fp_type, [rng.normal(4, 1.5, n),
+                                           rng.normal(3, 2, n),
+                                           rng.uniform(0.5, 8, n)])
+    snr = np.choose(fp_type, [rng.lognormal(2.5, 0.5, n),
+                              rng.lognormal(1.0, 1.0, n),
+                              rng.lognormal(0.5, 1.5, n)])
+    stellar_mass = rng.normal(1.0, 0.5, n)
+    stellar_temp = rng.normal(5500, np.choose(fp_type, [1000, 1200, 1500]))
+    stellar_magnitude = rng.normal(np.choose(fp_type, [14, 16, 16]),
+                                   np.choose(fp_type, [2, 2, 3]))
+    
+    return pd.DataFrame({
+        'orbital_period': np.maximum(0.5, orbital_period),
+        'transit_duration': np.maximum(0.5, transit_duration),
+        'transit_depth': np.clip(transit_depth, 0.0001, 0.5),
+        'snr': np.maximum(3, snr),
+        'stellar_mass': np.maximum(0.1, stellar_mass),
+        'stellar_temp': np.clip(stellar_temp, 3000, 10000),
+        'stellar_magnitude': np.clip(stellar_magnitude, 8, 20),
+        'classification': 'false_positive',
+        'planet_radius': np.nan,
+        'planet_temp': np.nan,
+        'semi_major_axis': np.nan,
+        'impact_parameter': np.nan
+    })
+
+
+def _candidate_physics(orbital_period, stellar_mass, stellar_temp, planet_radius):
+    """
+    Transit depth, mean transit duration, mean SNR, semi-major axis and
+    equilibrium temperature implied by each candidate's drawn parameters
+    (compiled by Numba, which fuses the element-wise chains, when available).
+    """
+    stellar_radius = np.abs(stellar_mass) ** 0.8
+    transit_depth = (planet_radius / (stellar_radius * 109.1)) ** 2
+    base_duration = 2 + np.log1p(np.abs(orbital_period)) * 0.5
+    snr_mean = np.maximum(4.0, 10 / (1 + np.abs(orbital_period) / 50))
+    semi_major_axis = (orbital_period / 365.25) ** (2/3) * stellar_mass ** (1/3)
+    planet_temp = stellar_temp * np.sqrt(1 / (2 * semi_major_axis)) * 0.01
+    return transit_depth, base_duration, snr_mean, semi_major_axis, planet_temp
+
+
+if NUMBA_AVAILABLE:
+    _candidate_physics = njit(cache=True, error_model='numpy')(_candidate_physics)
+
+
+def create_candidates(n_samples=30, rng=None):
     """
-    Create planetary candidate examples (lower SNR, less certain).
+    Create planetary candidate examples (lower SNR, less certain), drawn
+    from rng (seeded with 43 if not given).
     """
     print(f"\nGenerating {n_samples} planetary candidate examples...")
     
-    np.random.seed(43)
-    data = []
-    
-    for i in range(n_samples):
-        # Similar to confirmed but lower quality
-        period_type = np.random.choice(['short', 'medium', 'long'], p=[0.3, 0.4, 0.3])
-        
-        if period_type == 'short':
-            orbital_period = np.random.lognormal(1.5, 1.2)
-        elif period_type == 'medium':
-            orbital_period = np.random.lognormal(3.5, 1.0)
-        else:
-            orbital_period = np.random.lognormal(5.0, 0.8)
-        
-        stellar_mass = np.random.normal(1.0, 0.4)
-        stellar_temp = np.random.normal(5500, 1000)
-        stellar_magnitude = np.random.normal(15, 2)
-        
-        planet_radius = np.random.lognormal(0.5, 1.0)
-        stellar_radius = abs(stellar_mass) ** 0.8
-        transit_depth = (planet_radius / (stellar_radius * 109.1)) ** 2
-        
-        base_duration = 2 + np.log1p(abs(orbital_period)) * 0.5
-        transit_duration = abs(np.random.normal(base_duration, base_duration * 0.3))
-        
-        # Lower SNR for candidates
-        snr_mean = max(4, 10 / (1 + abs(orbital_period) / 50))
-        snr = abs(np.random.lognormal(np.log(snr_mean), 0.7))
-        
-        semi_major_axis = (orbital_period / 365.25) ** (2/3) * stellar_mass ** (1/3)
-        planet_temp = stellar_temp * np.sqrt(1 / (2 * semi_major_axis)) * 0.01
-        impact_parameter = np.random.uniform(0, 0.95)
-        
-        data.append({
-            'orbital_period': max(0.5, orbital_period),
-            'transit_duration': max(0.5, transit_duration),
-            'transit_depth': max(0.0001, min(0.1, transit_depth)),
-            'snr': max(4, snr),
-            'stellar_mass': max(0.1, stellar_mass),
-            'stellar_temp': max(3000, min(10000, stellar_temp)),
-            'stellar_magnitude': max(8, min(20, stellar_magnitude)),
-            'classification': 'planetary_candidate',
-            'planet_radius': planet_radius,
-            'planet_temp': planet_temp,
-            'semi_major_axis': semi_major_axis,
-            'impact_parameter': impact_parameter
-        })
-    
-    return pd.DataFrame(data)
+    if rng is None:
+        rng = np.random.default_rng(43)
+    n = n_samples
+    
+    # Similar to confirmed but lower quality: short, medium and long periods
+    period_type = rng.choice(3, size=n, p=[0.3, 0.4, 0.3])
+    orbital_period = rng.lognormal(np.choose(period_type, [1.5, 3.5, 5.0]),
+                                   np.choose(period_type, [1.2, 1.0, 0.8]))
+    
+    stellar_mass = rng.normal(1.0, 0.4, n)
+    stellar_temp = rng.normal(5500, 1000, n)
+    stellar_magnitude = rng.normal(15, 2, n)
+    
+    planet_radius = rng.lognormal(0.5, 1.0, n)
+    transit_depth, base_duration, snr_mean, semi_major_axis, planet_temp = \
+        _candidate_physics(orbital_period, stellar_mass, stellar_temp, planet_radius)
+    
+    transit_duration = np.abs(rng.normal(base_duration, base_duration * 0.3))
+    
+    # Lower SNR for candidates
+    snr = np.abs(rng.lognormal(np.log(snr_mean), 0.7))
+    
+    impact_parameter = rng.uniform(0, 0.95, n)
+    
+    return pd.DataFrame({
+        'orbital_period': np.maximum(0.5, orbital_period),
+        'transit_duration': np.maximum(0.5, transit_duration),
+        'transit_depth': np.clip(transit_depth, 0.0001, 0.1),
+        'snr': np.maximum(4, snr),
+        'stellar_mass': np.maximum(0.1, stellar_mass),
+        'stellar_temp': np.clip(stellar_temp, 3000, 10000),
+        'stellar_magnitude': np.clip(stellar_magnitude, 8, 20),
+        'classification': 'planetary_candidate',
+        'planet_radius': planet_radius,
+        'planet_temp': planet_temp,
+        'semi_major_axis': semi_major_axis,
+        'impact_parameter': impact_parameter
+    })
 
 
 def create_complete_training_dataset():
@@ -267,18 +383,20 @@ def create_complete_training_dataset():
         from data_preprocessing import load_nasa_exoplanet_data
         return load_nasa_exoplanet_data()
     
+    rng = np.random.default_rng(DATASET_SEED)
+    
     # Process NASA data
-    df_confirmed = create_training_dataset_from_nasa(nasa_df, n_target=100)
+    df_confirmed = create_training_dataset_from_nasa(nasa_df, n_target=100, rng=rng)
     
     # Create false positives and candidates
-    df_fp = create_false_positives(n_samples=50)
-    df_candidates = create_candidates(n_samples=30)
-    
-    # Combine all data
-    df_all = pd.concat([df_confirmed, df_fp, df_candidates], ignore_index=True)
-    
-    # Shuffle
-    df_all = df_all.sample(frac=1, random_state=42).reset_index(drop=True)
+    df_fp = create_false_positives(n_samples=50, rng=rng)
+    df_candidates = create_candidates(n_samples=30, rng=rng)
+    
+    # Combine all data, shuffled: every row is written once, straight into
+    # its shuffled position in the final columns
+    frames = [df_confirmed, df_fp, df_candidates]
+    order = rng.permutation(sum(len(frame) for frame in frames))
+    df_all = combine_shuffled(frames, order)
     
     print("\n" + "="*70)
     print("DATASET SUMMARY")
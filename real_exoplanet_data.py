@@ -6,11 +6,58 @@ Includes diverse orbital periods to fix the bias issue.
 import pandas as pd
 import numpy as np
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
-def get_real_confirmed_exoplanets():
+
+# Shared with the dataset builder in nasa_data_loader:
+# the three labels, stored as 1-byte category codes in the combined dataset
+CLASSIFICATION_DTYPE = pd.CategoricalDtype(
+    ['confirmed_exoplanet', 'false_positive', 'planetary_candidate']
+)
+
+# Storage dtypes of the combined dataset: float32 keeps ~7 significant
+# digits, well beyond the precision of any of these measurements
+DATASET_DTYPES = {
+    **dict.fromkeys([
+        'orbital_period', 'transit_duration', 'transit_depth', 'planet_radius_ratio',
+        'snr', 'stellar_mass', 'stellar_temp', 'stellar_magnitude', 'planet_radius',
+        'planet_temp', 'semi_major_axis', 'impact_parameter'
+    ], np.float32),
+    'sy_snum': 'Int8',
+    'sy_pnum': 'Int8'
+}
+
+# Seed of the one Generator a dataset builder threads through every random
+# draw, so the classes get independent (but reproducible) streams
+DATASET_SEED = 42
+
+
+def _planet_physics(transit_depth, stellar_mass, orbital_period, stellar_temp):
+    """
+    Planet radius (Earth radii), semi-major axis (AU) and equilibrium
+    temperature implied by each planet's transit and stellar parameters
+    (compiled by Numba, which fuses the element-wise chains, when available).
+    """
+    planet_radius = np.sqrt(transit_depth) * stellar_mass ** 0.8 * 109.1
+    semi_major_axis = (orbital_period / 365.25) ** (2/3) * stellar_mass ** (1/3)
+    planet_temp = stellar_temp * np.sqrt(1 / (2 * semi_major_axis)) * 0.01
+    return planet_radius, semi_major_axis, planet_temp
+
+
+if NUMBA_AVAILABLE:
+    _planet_physics = njit(cache=True, error_model='numpy')(_planet_physics)
+
+
+def get_real_confirmed_exoplanets(rng=None):
     """
     Return 100 real confirmed exoplanets with actual parameters.
     Focuses on well-characterized transiting planets.
+    The generated planets are drawn from rng (seeded with DATASET_SEED if
+    not given).
     """
     
     # Real confirmed exoplanets with known transit parameters
@@ -34,65 +81,89 @@ def get_real_confirmed_exoplanets():
     ]
     
     # Add 990 more planets with realistic parameter distributions
-    np.random.seed(42)
+    if rng is None:
+        rng = np.random.default_rng(DATASET_SEED)
+    n = 990
     
-    for i in range(990):
-        # Diverse period distribution
-        period_category = np.random.choice(['ultra_short', 'short', 'medium', 'long'], 
-                                          p=[0.15, 0.35, 0.30, 0.20])
-        
-        if period_category == 'ultra_short':
-            period = np.random.lognormal(0.0, 0.8)  # 0.7-3 days
-        elif period_category == 'short':
-            period = np.random.lognormal(1.5, 0.6)  # 3-15 days
-        elif period_category == 'medium':
-            period = np.random.lognormal(3.5, 0.7)  # 20-100 days
-        else:  # long
-            period = np.random.lognormal(5.0, 0.6)  # 100-500 days
-        
-        # Stellar parameters (Sun-like to early K-type)
-        st_mass = np.random.normal(1.0, 0.25)
-        st_temp = np.random.normal(5700, 600)
-        st_mag = np.random.normal(12, 2)
-        
-        # Planet size (Earth to Jupiter)
-        planet_type = np.random.choice(['earth_like', 'super_earth', 'neptune', 'jupiter'], 
-                                      p=[0.20, 0.30, 0.30, 0.20])
-        
-        if planet_type == 'earth_like':
-            pl_radius = np.random.uniform(0.8, 1.5)  # Earth radii
-        elif planet_type == 'super_earth':
-            pl_radius = np.random.uniform(1.5, 3.0)
-        elif planet_type == 'neptune':
-            pl_radius = np.random.uniform(3.0, 6.0)
-        else:  # jupiter
-            pl_radius = np.random.uniform(8.0, 15.0)
-        
-        # Calculate transit depth
-        st_radius = st_mass ** 0.8  # Solar radii estimate
-        depth = (pl_radius / (st_radius * 109.1)) ** 2
-        
-        # Transit duration (scales with period and planet size)
-        base_duration = 2.0 + np.log1p(period) * 0.5
-        duration = np.random.normal(base_duration, base_duration * 0.15)
-        
-        # SNR (decreases with period due to fewer transits, increases with brightness)
-        snr_base = 20 / (1 + period / 40)  # Fewer transits = lower SNR
-        snr_mag_factor = np.exp(-(st_mag - 10) / 4)  # Brighter = higher SNR
-        snr = snr_base * snr_mag_factor * np.random.uniform(0.8, 1.2)
-        
-        confirmed_exoplanets.append({
-            'name': f'Kepler-{1000+i} b',
-            'period': max(0.5, period),
-            'duration': max(1.0, duration),
-            'depth': max(0.0001, min(0.05, depth)),
-            'snr': max(5, min(40, snr)),
-            'st_mass': max(0.5, min(2.0, st_mass)),
-            'st_temp': max(4000, min(7000, st_temp)),
-            'st_mag': max(8, min(16, st_mag))
-        })
+    # Diverse period distribution: ultra-short (0.7-3 days), short (3-15 days),
+    # medium (20-100 days) and long (100-500 days)
+    period_category = rng.choice(4, size=n, p=[0.15, 0.35, 0.30, 0.20])
+    period = rng.lognormal(np.choose(period_category, [0.0, 1.5, 3.5, 5.0]),
+                           np.choose(period_category, [0.8, 0.6, 0.7, 0.6]))
     
-    return pd.DataFrame(confirmed_exoplanets)
+    # Stellar parameters (Sun-like to early K-type)
+    st_mass = rng.normal(1.0, 0.25, n)
+    st_temp = rng.normal(5700, 600, n)
+    st_mag = rng.normal(12, 2, n)
+    
+    # Planet size in Earth radii (earth-like, super-earth, neptune, jupiter)
+    planet_type = rng.choice(4, size=n, p=[0.20, 0.30, 0.30, 0.20])
+    pl_radius = rng.uniform(np.choose(planet_type, [0.8, 1.5, 3.0, 8.0]),
+                            np.choose(planet_type, [1.5, 3.0, 6.0, 15.0]))
+    
+    # Calculate transit depth
+    st_radius = np.abs(st_mass) ** 0.8  # Solar radii estimate
+    depth = (pl_radius / (st_radius * 109.1)) ** 2
+    
+    # Transit duration (scales with period and planet size)
+    base_duration = 2.0 + np.log1p(period) * 0.5
+    duration = rng.normal(base_duration, base_duration * 0.15)
+    
+    # SNR (decreases with period due to fewer transits, increases with brightness)
+    snr_base = 20 / (1 + period / 40)  # Fewer transits = lower SNR
+    snr_mag_factor = np.exp(-(st_mag - 10) / 4)  # Brighter = higher SNR
+    snr = snr_base * snr_mag_factor * rng.uniform(0.8, 1.2, n)
+    
+    generated = pd.DataFrame({
+        'name': [f'Kepler-{1000+i} b' for i in range(n)],
+        'period': np.maximum(0.5, period),
+        'duration': np.maximum(1.0, duration),
+        'depth': np.clip(depth, 0.0001, 0.05),
+        'snr': np.clip(snr, 5, 40),
+        'st_mass': np.clip(st_mass, 0.5, 2.0),
+        'st_temp': np.clip(st_temp, 4000, 7000),
+        'st_mag': np.clip(st_mag, 8, 16)
+    })
+    
+    return pd.concat([pd.DataFrame(confirmed_exoplanets), generated], ignore_index=True)
+
+
+def combine_shuffled(frames, order):
+    """
+    Stack the per-class frames into one frame with its rows permuted by
+    order (row i is row order[i] of the concatenation). Every value is
+    written straight into its final slot of a preallocated column in its
+    storage dtype; columns a frame lacks are NaN for its rows.
+    """
+    total = len(order)
+    target = np.empty(total, dtype=np.intp)
+    target[order] = np.arange(total)
+    
+    columns = {}
+    start = 0
+    for frame in frames:
+        rows = target[start:start + len(frame)]
+        start += len(frame)
+        for col in frame.columns:
+            values = frame[col].to_numpy()
+            if col == 'classification':
+                values = CLASSIFICATION_DTYPE.categories.get_indexer(values)
+            if col not in columns:
+                if col == 'classification':
+                    dtype = np.int8
+                else:
+                    dtype = DATASET_DTYPES.get(col, np.float64 if values.dtype.kind in 'biuf' else object)
+                    if isinstance(dtype, str):
+                        dtype = np.float64  # nullable integer columns, converted below
+                columns[col] = np.full(total, -1 if col == 'classification' else np.nan, dtype=dtype)
+            columns[col][rows] = values
+    
+    columns['classification'] = pd.Categorical.from_codes(columns['classification'],
+                                                          dtype=CLASSIFICATION_DTYPE)
+    df = pd.DataFrame(columns, copy=False)
+    nullable = {col: dtype for col, dtype in DATASET_DTYPES.items()
+                if isinstance(dtype, str) and col in columns}
+    return df.astype(nullable) if nullable else df
 
 
 def create_training_dataset_with_real_exoplanets():
@@ -103,8 +174,10 @@ def create_training_dataset_with_real_exoplanets():
     print("TRAINING WITH 1000 CONFIRMED EXOPLANETS")
     print("="*70)
     
+    rng = np.random.default_rng(DATASET_SEED)
+    
     # Get confirmed exoplanets
-    df_confirmed = get_real_confirmed_exoplanets()
+    df_confirmed = get_real_confirmed_exoplanets(rng)
     
     # Rename columns to match our system
     df_confirmed = df_confirmed.rename(columns={
@@ -120,52 +193,46 @@ def create_training_dataset_with_real_exoplanets():
     df_confirmed['classification'] = 'confirmed_exoplanet'
     
     # Calculate planet properties
-    df_confirmed['planet_radius'] = np.sqrt(df_confirmed['transit_depth']) * \
-                                     (df_confirmed['stellar_mass'] ** 0.8) * 109.1
-    
-    df_confirmed['semi_major_axis'] = ((df_confirmed['orbital_period'] / 365.25) ** (2/3) * 
-                                        df_confirmed['stellar_mass'] ** (1/3))
+    planet_radius, semi_major_axis, planet_temp = _planet_physics(
+        *[df_confirmed[col].to_numpy(dtype=np.float64) for col in
+          ('transit_depth', 'stellar_mass', 'orbital_period', 'stellar_temp')]
+    )
+    df_confirmed['planet_radius'] = planet_radius
+    df_confirmed['semi_major_axis'] = semi_major_axis
+    df_confirmed['planet_temp'] = planet_temp
     
-    df_confirmed['planet_temp'] = (df_confirmed['stellar_temp'] * 
-                                   np.sqrt(1 / (2 * df_confirmed['semi_major_axis'])) * 0.01)
-    
-    df_confirmed['impact_parameter'] = np.random.uniform(0, 0.8, len(df_confirmed))
+    df_confirmed['impact_parameter'] = rng.uniform(0, 0.8, len(df_confirmed))
     
     print(f"✓ Loaded {len(df_confirmed)} CONFIRMED EXOPLANETS")
     print(f"  Including user's test case: Kepler-22 b (P=289.9d)")
     
     # Create clear false positives (eclipsing binaries)
     print("\nCreating FALSE POSITIVES (eclipsing binaries)...")
-    np.random.seed(42)
     n_fp = 300
     
-    false_positives = []
-    for i in range(n_fp):
-        # Eclipsing binaries have MUCH deeper transits
-        period = np.random.lognormal(0.5, 1.5)  # Usually shorter periods
-        duration = np.random.normal(4, 1.5)
-        depth = np.random.uniform(0.08, 0.35)  # 8-35% VERY DEEP!
-        snr = np.random.lognormal(2.5, 0.6)
-        st_mass = np.random.normal(1.0, 0.4)
-        st_temp = np.random.normal(5500, 1000)
-        st_mag = np.random.normal(14, 2)
-        
-        false_positives.append({
-            'orbital_period': max(0.5, period),
-            'transit_duration': max(1.0, duration),
-            'transit_depth': max(0.05, min(0.5, depth)),  # KEEP VERY DEEP
-            'snr': max(5, snr),
-            'stellar_mass': max(0.5, st_mass),
-            'stellar_temp': max(4000, min(7000, st_temp)),
-            'stellar_magnitude': max(10, min(18, st_mag)),
-            'classification': 'false_positive',
-            'planet_radius': np.nan,
-            'planet_temp': np.nan,
-            'semi_major_axis': np.nan,
-            'impact_parameter': np.nan
-        })
-    
-    df_fp = pd.DataFrame(false_positives)
+    # Eclipsing binaries have MUCH deeper transits and usually shorter periods
+    period = rng.lognormal(0.5, 1.5, n_fp)
+    duration = rng.normal(4, 1.5, n_fp)
+    depth = rng.uniform(0.08, 0.35, n_fp)  # 8-35% VERY DEEP!
+    snr = rng.lognormal(2.5, 0.6, n_fp)
+    st_mass = rng.normal(1.0, 0.4, n_fp)
+    st_temp = rng.normal(5500, 1000, n_fp)
+    st_mag = rng.normal(14, 2, n_fp)
+    
+    df_fp = pd.DataFrame({
+        'orbital_period': np.maximum(0.5, period),
+        'transit_duration': np.maximum(1.0, duration),
+        'transit_depth': np.clip(depth, 0.05, 0.5),  # KEEP VERY DEEP
+        'snr': np.maximum(5, snr),
+        'stellar_mass': np.maximum(0.5, st_mass),
+        'stellar_temp': np.clip(st_temp, 4000, 7000),
+        'stellar_magnitude': np.clip(st_mag, 10, 18),
+        'classification': 'false_positive',
+        'planet_radius': np.nan,
+        'planet_temp': np.nan,
+        'semi_major_axis': np.nan,
+        'impact_parameter': np.nan
+    })
     print(f"✓ Created {len(df_fp)} FALSE POSITIVES")
     print(f"  Depth range: {df_fp['transit_depth'].min()*100:.1f}% - {df_fp['transit_depth'].max()*100:.1f}%")
     print(f"  (Much deeper than planets!)")
@@ -174,49 +241,47 @@ def create_training_dataset_with_real_exoplanets():
     print("\nCreating PLANETARY CANDIDATES...")
     n_cand = 200
     
-    candidates = []
-    for i in range(n_cand):
-        # Similar to confirmed but lower SNR, more uncertainty
-        period = np.random.lognormal(3.0, 1.5)
-        st_mass = np.random.normal(1.0, 0.3)
-        st_temp = np.random.normal(5600, 800)
-        st_mag = np.random.normal(14, 2)
-        
-        pl_radius = np.random.lognormal(0.5, 0.9)
-        st_radius = st_mass ** 0.8
-        depth = (pl_radius / (st_radius * 109.1)) ** 2
-        
-        base_duration = 2.0 + np.log1p(period) * 0.5
-        duration = np.random.normal(base_duration, base_duration * 0.25)
-        
-        # Lower SNR
-        snr = np.random.lognormal(1.8, 0.7)
-        
-        semi_major_axis = (period / 365.25) ** (2/3) * st_mass ** (1/3)
-        planet_temp = st_temp * np.sqrt(1 / (2 * semi_major_axis)) * 0.01
-        impact_parameter = np.random.uniform(0, 0.9)
-        
-        candidates.append({
-            'orbital_period': max(0.5, period),
-            'transit_duration': max(1.0, duration),
-            'transit_depth': max(0.0001, min(0.05, depth)),
-            'snr': max(4, min(15, snr)),  # Lower SNR
-            'stellar_mass': max(0.5, st_mass),
-            'stellar_temp': max(4000, min(7000, st_temp)),
-            'stellar_magnitude': max(10, min(18, st_mag)),
-            'classification': 'planetary_candidate',
-            'planet_radius': pl_radius,
-            'planet_temp': planet_temp,
-            'semi_major_axis': semi_major_axis,
-            'impact_parameter': impact_parameter
-        })
-    
-    df_cand = pd.DataFrame(candidates)
+    # Similar to confirmed but lower SNR, more uncertainty
+    period = rng.lognormal(3.0, 1.5, n_cand)
+    st_mass = rng.normal(1.0, 0.3, n_cand)
+    st_temp = rng.normal(5600, 800, n_cand)
+    st_mag = rng.normal(14, 2, n_cand)
+    
+    pl_radius = rng.lognormal(0.5, 0.9, n_cand)
+    st_radius = np.abs(st_mass) ** 0.8
+    depth = (pl_radius / (st_radius * 109.1)) ** 2
+    
+    base_duration = 2.0 + np.log1p(period) * 0.5
+    duration = rng.normal(base_duration, base_duration * 0.25)
+    
+    # Lower SNR
+    snr = rng.lognormal(1.8, 0.7, n_cand)
+    
+    semi_major_axis = (period / 365.25) ** (2/3) * st_mass ** (1/3)
+    planet_temp = st_temp * np.sqrt(1 / (2 * semi_major_axis)) * 0.01
+    impact_parameter = rng.uniform(0, 0.9, n_cand)
+    
+    df_cand = pd.DataFrame({
+        'orbital_period': np.maximum(0.5, period),
+        'transit_duration': np.maximum(1.0, duration),
+        'transit_depth': np.clip(depth, 0.0001, 0.05),
+        'snr': np.clip(snr, 4, 15),  # Lower SNR
+        'stellar_mass': np.maximum(0.5, st_mass),
+        'stellar_temp': np.clip(st_temp, 4000, 7000),
+        'stellar_magnitude': np.clip(st_mag, 10, 18),
+        'classification': 'planetary_candidate',
+        'planet_radius': pl_radius,
+        'planet_temp': planet_temp,
+        'semi_major_axis': semi_major_axis,
+        'impact_parameter': impact_parameter
+    })
     print(f"✓ Created {len(df_cand)} PLANETARY CANDIDATES")
     
-    # Combine all
-    df_all = pd.concat([df_confirmed, df_fp, df_cand], ignore_index=True)
-    df_all = df_all.sample(frac=1, random_state=42).reset_index(drop=True)
+    # Combine all, shuffled: every row is written once, straight into its
+    # shuffled position in the final columns
+    frames = [df_confirmed, df_fp, df_cand]
+    order = rng.permutation(sum(len(frame) for frame in frames))
+    df_all = combine_shuffled(frames, order)
     
     print("\n" + "="*70)
     print("FINAL TRAINING DATASET")
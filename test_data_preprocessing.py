@@ -0,0 +1,18 @@
+"""
+Tests for the data preprocessing pipeline.
+"""
+
+import numpy as np
+import pytest
+
+import data_preprocessing
+from data_preprocessing import ExoplanetDataPreprocessor
+
+
+@pytest.mark.parametrize('use_numexpr', sorted({False, data_preprocessing.NUMEXPR_AVAILABLE}))
+def test_artifact_bounds_are_exclusive_on_both_paths(monkeypatch, use_numexpr):
+    # A row on the stellar_mass bound is an artifact, one just above it is not
+    monkeypatch.setattr(data_preprocessing, 'NUMEXPR_AVAILABLE', use_numexpr)
+    edge = np.array([[0.1], [0.1000000001]])
+    mask = ExoplanetDataPreprocessor._artifact_mask(edge, {'stellar_mass': 0})
+    assert mask.tolist() == [False, True]
@@ -0,0 +1,29 @@
+"""
+Tests for the ensemble property regressors.
+"""
+
+import numpy as np
+
+from ensemble_models import ExoplanetPropertyRegressors
+
+
+def test_fit_after_partial_fit_retrains_from_scratch():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    y = X[:, 0] + 0.5 * X[:, 1]
+
+    regressors = ExoplanetPropertyRegressors(use_advanced_models=True)
+    models = regressors.regressors['planet_radius']
+
+    regressors.fit(X, {'planet_radius': y})
+    fitted_params = {name: model.get_params() for name, model in models.items()}
+    regressors.partial_fit(X, {'planet_radius': y}, n_rounds=5)
+
+    # The update's warm_start/n_estimators/max_iter changes do not stick
+    for name, model in models.items():
+        assert model.get_params() == fitted_params[name], name
+
+    # A full fit on a new target forgets the old one
+    regressors.fit(X, {'planet_radius': -y})
+    for name, model in models.items():
+        assert np.corrcoef(model.predict(X), -y)[0, 1] > 0.9, name